@@ -28,6 +28,9 @@ args = {
     # Visualisation
     "plot_settings":{
         "plot_comps_of_interest": False, # plot only pypsa-components of interest ara
+        "map_mode": "separate", # "separate" (5 maps), optional: "combined" (1 map with layers) or "both"
+        "nuts_layer": {"zoom": 9, "precision": 4, "topojson": False, "clip_margin": 0.5}, # simplified NUTS-3 background, zoom None: full precision
+        "large_network": {"mode": "auto", "canvas_threshold": 2000, "cluster_threshold": 5000, "lod_zoom": 10}, # Canvas/clusters for large networks
         "bussize": 10,
         "linkwidth": 5,
         "linewidth": 3,
@@ -44,6 +47,7 @@ etrago.create_maps()
 #etrago.create_lines_map()
 #etrago.create_buses_and_links_map()
 #etrago.create_buses_links_lines_map()
+#etrago.create_combined_map()
 #logger.info("Maps successfully created.")
 
 
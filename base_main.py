@@ -6,6 +6,15 @@ import numpy as np
 
 
 from network_visual import Etrago1
+from plot_base_results import (
+    central_heat_dispatch_data,
+    render_capacity_bar,
+    render_central_heat_dispatch,
+    render_generation_bar,
+    render_generation_breakdown,
+    time_tagged_filename,
+)
+from render_pool import FigureJob, render_figures
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -33,39 +42,50 @@ args = {
         "linkwidth": 5,
         "linewidth": 3,
     },
+    "render_workers": 1, # >1: render the figures in parallel worker processes
 }
 
 def calc_base_results(args):
     etrago = Etrago1(args, csv_folder = args["pypsa_network"])
-    etrago.plot_capacity_bar(
-        title="Optimierte Kapaziäten mit vorhandenen Kapazitäten",
-        filename="capacity_bar.png",
-        output_folder=args["results_folder"]
-    )
-    etrago.plot_electricity_generation_bar(
-        title="Stromerversorgung je Technologie",
-        filename="generation_bar.png",
-        output_folder=args["results_folder"]
-    )
+    results_folder = args["results_folder"]
 
-    etrago.plot_central_heat_generation_bar(
-        title="Zentrale Wärmerversorgung je Technologie",
-        filename="central_heat_generation_bar.png",
-        output_folder=args["results_folder"]
-    )
+    # all plot data is computed here once, the workers only render
+    results = etrago.interest_area_results()
+    carrier_grouped, central_heat_ts = central_heat_dispatch_data(etrago, time=args["time_horizon"])
+    # monthly generation per carrier from the cumulative-sum indices (energy_index.py)
+    monthly_generation = etrago.generation_breakdown(freq="M")
 
-    etrago.plot_decentral_heat_generation_bar(
-        title="dezentrale Wärmerversorgung je Technologie",
-        filename="decentral_heat_generation_bar.png",
-        output_folder=args["results_folder"]
-    )
-
-    etrago.plot_central_heat_dispatch(
-        time=args["time_horizon"],
-        title="Dispatch Central Heat und Wärmeerzeuger",
-        filename="central_heat_dispatch.png",
-        output_folder=args["results_folder"]
-    )
+    jobs = [
+        FigureJob(render_capacity_bar, dict(
+            df_caps=results.capacities.copy(),
+            title="Optimierte Kapaziäten mit vorhandenen Kapazitäten",
+        ), os.path.join(results_folder, "capacity_bar.png")),
+        FigureJob(render_generation_bar, dict(
+            df_generation=results.electricity, value_column="generation",
+            title="Stromerversorgung je Technologie",
+            color="steelblue", xlabel="Stromerzeugung [GWh]",
+        ), os.path.join(results_folder, "generation_bar.png")),
+        FigureJob(render_generation_bar, dict(
+            df_generation=results.central_heat, value_column="generation_cH",
+            title="Zentrale Wärmerversorgung je Technologie",
+            color="indianred", xlabel="Heat Generation [GWh_th]",
+        ), os.path.join(results_folder, "central_heat_generation_bar.png")),
+        FigureJob(render_generation_bar, dict(
+            df_generation=results.decentral_heat, value_column="generation_dH",
+            title="dezentrale Wärmerversorgung je Technologie",
+            color="darkorange", xlabel="Heat Generation [GWh_th]",
+        ), os.path.join(results_folder, "decentral_heat_generation_bar.png")),
+        FigureJob(render_generation_breakdown, dict(
+            df_breakdown=monthly_generation, bus_carrier="AC",
+            title="Monatliche Stromerzeugung je Technologie",
+            ylabel="Stromerzeugung [GWh]",
+        ), os.path.join(results_folder, "generation_monthly.png")),
+        FigureJob(render_central_heat_dispatch, dict(
+            carrier_grouped=carrier_grouped, central_heat_ts=central_heat_ts,
+            title="Dispatch Central Heat und Wärmeerzeuger",
+        ), os.path.join(results_folder, time_tagged_filename("central_heat_dispatch.png", args["time_horizon"]))),
+    ]
+    render_figures(jobs, n_workers=args.get("render_workers", 1))
 
     return etrago
 
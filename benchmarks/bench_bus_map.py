@@ -0,0 +1,75 @@
+"""
+Benchmark: bus map generation with one CircleMarker per bus vs. one GeoJSON layer per carrier.
+
+Usage
+-----
+python benchmarks/bench_bus_map.py                      # up to ~10k buses
+python benchmarks/bench_bus_map.py --n-sites 500 1000 2000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import folium
+import geopandas as gpd
+
+from synthetic_network import synthetic_network
+from plot_comps import add_bus_layers, get_carrier_color_map
+
+
+def circle_markers(m, gdf_buses, carrier_color_map, legend_order, bussize):
+    # previous implementation: one folium object per bus
+    for _, row in gdf_buses.iterrows():
+        color = carrier_color_map[row['carrier']]
+        folium.CircleMarker(
+            location=[row.geometry.y, row.geometry.x],
+            radius=bussize,
+            color=color,
+            fill=True,
+            fill_color=color,
+            fill_opacity=0.9,
+            popup=f"<b>Bus:</b> {row['name']}<br><b>Carrier:</b> {row['carrier']}",
+            tooltip=f"{row['name']} ({row['carrier']})"
+        ).add_to(m)
+
+
+def build_map(gdf_buses, add_buses, output_file):
+    start = time.perf_counter()
+    m = folium.Map(location=[gdf_buses.geometry.y.mean(), gdf_buses.geometry.x.mean()], zoom_start=7)
+    carrier_color_map, legend_order = get_carrier_color_map(gdf_buses["carrier"].unique())
+    add_buses(m, gdf_buses, carrier_color_map, legend_order, 6)
+    folium.LayerControl().add_to(m)
+    m.save(output_file)
+    return time.perf_counter() - start, os.path.getsize(output_file) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    # six buses per site (colocated carriers), 1700 sites ~ 10k buses
+    parser.add_argument("--n-sites", type=int, nargs="+", default=[200, 800, 1700])
+    options = parser.parse_args()
+
+    output_folder = tempfile.mkdtemp()
+    try:
+        print(f"{'buses':>7} {'method':<14} {'time [s]':>9} {'HTML [MB]':>10}")
+        for n_sites in options.n_sites:
+            network = synthetic_network(n_sites=n_sites, n_snapshots=1, with_series=False)
+            buses = network.buses.copy()
+            buses["name"] = buses.index
+            gdf_buses = gpd.GeoDataFrame(
+                buses, geometry=gpd.points_from_xy(buses["x"], buses["y"]), crs="EPSG:4326"
+            )
+
+            for label, add_buses in [("CircleMarker", circle_markers), ("GeoJSON", add_bus_layers)]:
+                elapsed, size = build_map(
+                    gdf_buses, add_buses, os.path.join(output_folder, f"{label}_{n_sites}.html")
+                )
+                print(f"{len(gdf_buses):>7} {label:<14} {elapsed:>9.2f} {size:>10.1f}")
+    finally:
+        shutil.rmtree(output_folder)
+
+
+if __name__ == "__main__":
+    main()
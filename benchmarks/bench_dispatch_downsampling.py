@@ -0,0 +1,53 @@
+"""
+Benchmark: render time and PNG size of plot_central_heat_dispatch with and without downsampling.
+
+Usage
+-----
+python benchmarks/bench_dispatch_downsampling.py
+python benchmarks/bench_dispatch_downsampling.py --n-sites 50 --method lttb
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+from synthetic_network import BenchEtrago, bench_args, synthetic_network
+from plot_base_results import plot_central_heat_dispatch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-sites", type=int, default=30)
+    parser.add_argument("--method", default="minmax", choices=["minmax", "lttb"])
+    options = parser.parse_args()
+
+    network = synthetic_network(n_sites=options.n_sites, n_snapshots=8760)
+    # empty name fragment: every NUTS-3 region is part of the interest area
+    etrago = BenchEtrago(network, bench_args(interest_area=("",)))
+
+    output_folder = tempfile.mkdtemp()
+    try:
+        print(f"{'horizon':<8} {'downsample':<11} {'render [s]':>11} {'PNG [kB]':>10}")
+        for label, horizon in [("1 month", "2011-01"), ("1 year", None)]:
+            for downsample in (False, True):
+                filename = f"dispatch_{label.replace(' ', '_')}_{downsample}.png"
+                start = time.perf_counter()
+                plot_central_heat_dispatch(
+                    etrago, time=horizon, filename=filename, output_folder=output_folder,
+                    downsample=downsample, downsample_method=options.method,
+                )
+                elapsed = time.perf_counter() - start
+
+                files = [f for f in os.listdir(output_folder) if f.startswith(filename[:-4])]
+                size = os.path.getsize(os.path.join(output_folder, files[0])) / 1e3
+                print(f"{label:<8} {str(downsample):<11} {elapsed:>11.2f} {size:>10.0f}")
+    finally:
+        shutil.rmtree(output_folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: apply_jitter_to_duplicate_buses (numpy) vs. the previous per-bus loop, on co-located buses.
+
+Usage
+-----
+python benchmarks/bench_jitter.py                  # 2000 sites x 6 carriers = 12k buses
+python benchmarks/bench_jitter.py --n-sites 5000
+"""
+import argparse
+import time
+
+import geopandas as gpd
+import numpy as np
+from shapely.affinity import translate
+
+from synthetic_network import synthetic_network
+from plot_comps import apply_jitter_to_duplicate_buses
+
+
+def jitter_loop(gdf_buses, epsg_m=3857, jitter_radius=500):
+    # previous implementation, kept as reference
+    original_crs = gdf_buses.crs
+    gdf_proj = gdf_buses.to_crs(epsg=epsg_m)
+
+    coord_series = gdf_proj.geometry.apply(lambda g: (round(g.x, 1), round(g.y, 1)))
+    coord_counts = coord_series.value_counts()
+    duplicate_coords = coord_counts[coord_counts > 1].index
+
+    for coord in duplicate_coords:
+        idxs = coord_series[coord_series == coord].index
+        for i, idx in enumerate(idxs):
+            angle = 2 * np.pi * i / len(idxs)
+            dx = jitter_radius * np.cos(angle)
+            dy = jitter_radius * np.sin(angle)
+            gdf_proj.at[idx, 'geometry'] = translate(gdf_proj.at[idx, 'geometry'], xoff=dx, yoff=dy)
+
+    return gdf_proj.to_crs(original_crs)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-sites", type=int, default=2000)
+    options = parser.parse_args()
+
+    network = synthetic_network(n_sites=options.n_sites, n_snapshots=1, with_series=False)
+    buses = network.buses.copy()
+    buses["name"] = buses.index
+    gdf_buses = gpd.GeoDataFrame(
+        buses, geometry=gpd.points_from_xy(buses["x"], buses["y"]), crs="EPSG:4326"
+    )
+
+    reference, t_loop = _timed(lambda: jitter_loop(gdf_buses))
+    jittered, t_numpy = _timed(lambda: apply_jitter_to_duplicate_buses(gdf_buses))
+
+    print(f"buses: {len(gdf_buses)} ({options.n_sites} sites)")
+    print(f"loop    : {t_loop:8.3f} s")
+    print(f"numpy   : {t_numpy:8.3f} s")
+    print(f"speed-up: {t_loop / t_numpy:8.1f} x")
+
+    identical = (
+        np.array_equal(reference.geometry.x.to_numpy(), jittered.geometry.x.to_numpy())
+        and np.array_equal(reference.geometry.y.to_numpy(), jittered.geometry.y.to_numpy())
+    )
+    print(f"identical coordinates: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: bus and complete maps of growing synthetic networks, SVG vs. large-network mode (Canvas + clusters).
+
+Usage
+-----
+python benchmarks/bench_large_network_map.py
+python benchmarks/bench_large_network_map.py --n-sites 1000 5000 10000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from synthetic_network import BenchEtrago, bench_args, synthetic_network
+from plot_comps import create_bus_map, create_buses_links_lines_map, prepare_map_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    # six buses per site (colocated carriers)
+    parser.add_argument("--n-sites", type=int, nargs="+", default=[300, 1000, 3000, 6000])
+    options = parser.parse_args()
+
+    cwd = os.getcwd()
+    output_folder = tempfile.mkdtemp()
+    os.chdir(output_folder)
+    try:
+        print(f"{'buses':>7} {'mode':<5} {'canvas':<7} {'cluster':<8} {'map':<18} {'time [s]':>9} {'HTML [MB]':>10}")
+        for n_sites in options.n_sites:
+            network = synthetic_network(n_sites=n_sites, n_snapshots=1, with_series=False)
+            for mode in ("off", "auto"):
+                args = bench_args()
+                args["plot_settings"]["large_network"] = {"mode": mode}
+                etrago = BenchEtrago(network, args)
+
+                map_data = prepare_map_data(etrago)
+                rendering = map_data["rendering"]
+                for label, build in [("bus", create_bus_map), ("buses_links_lines", create_buses_links_lines_map)]:
+                    start = time.perf_counter()
+                    output_file = build(etrago, map_data)
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"{len(network.buses):>7} {mode:<5} {str(rendering['prefer_canvas']):<7} "
+                        f"{str(rendering['cluster']):<8} {label:<18} {elapsed:>9.2f} "
+                        f"{os.path.getsize(output_file) / 1e6:>10.1f}"
+                    )
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(output_folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: HTML size per map type with the full, simplified and TopoJSON NUTS-3 layer.
+
+Usage
+-----
+python benchmarks/bench_map_size.py
+python benchmarks/bench_map_size.py --n-sites 100 --zoom 8
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from synthetic_network import BenchEtrago, bench_args, synthetic_network
+from plot_comps import (
+    create_bus_map,
+    create_buses_and_links_map,
+    create_buses_links_lines_map,
+    create_combined_map,
+    create_lines_map,
+    create_links_map,
+    prepare_map_data,
+)
+
+MAP_BUILDERS = {
+    "bus": create_bus_map,
+    "links": create_links_map,
+    "lines": create_lines_map,
+    "buses_links": create_buses_and_links_map,
+    "buses_links_lines": create_buses_links_lines_map,
+    "combined": create_combined_map,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-sites", type=int, default=30)
+    parser.add_argument("--zoom", type=int, default=9)
+    parser.add_argument("--precision", type=int, default=4)
+    options = parser.parse_args()
+
+    variants = {
+        "full": {"zoom": None, "precision": None, "topojson": False},
+        "simplified": {"zoom": options.zoom, "precision": options.precision, "topojson": False},
+        "topojson": {"zoom": options.zoom, "precision": options.precision, "topojson": True},
+    }
+
+    network = synthetic_network(n_sites=options.n_sites, n_snapshots=1, with_series=False)
+    args = bench_args()
+
+    cwd = os.getcwd()
+    output_folder = tempfile.mkdtemp()
+    os.chdir(output_folder)
+    try:
+        sizes = {}
+        for variant, nuts_layer in variants.items():
+            args["plot_settings"]["nuts_layer"] = nuts_layer
+            etrago = BenchEtrago(network, args)
+            map_data = prepare_map_data(etrago)
+            for map_type, build in MAP_BUILDERS.items():
+                output_file = build(etrago, map_data)
+                sizes[map_type, variant] = os.path.getsize(output_file) / 1e3
+
+        print(f"{'map':<18}" + "".join(f"{v + ' [kB]':>18}" for v in variants))
+        for map_type in MAP_BUILDERS:
+            print(f"{map_type:<18}" + "".join(f"{sizes[map_type, v]:>18.0f}" for v in variants))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(output_folder)
+
+
+if __name__ == "__main__":
+    main()
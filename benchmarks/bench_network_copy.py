@@ -0,0 +1,88 @@
+"""
+Peak-RSS benchmark: interest-area query with and without ``network.copy()``.
+
+Every variant runs in a fresh process, so the reported peak-RSS increase is
+the memory the query itself needs on top of the loaded network.
+
+Usage
+-----
+python benchmarks/bench_network_copy.py                       # synthetic network
+python benchmarks/bench_network_copy.py --csv-folder <etrago_results/...>
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import time
+
+import geopandas as gpd
+
+from synthetic_network import BenchEtrago, bench_args, synthetic_network
+
+
+def _max_rss_mb():
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _load(options):
+    import pypsa
+
+    if options["csv_folder"]:
+        return pypsa.Network(options["csv_folder"])
+    return synthetic_network(n_sites=options["n_sites"], n_snapshots=options["n_snapshots"])
+
+
+def _query_with_copy(etrago):
+    # previous implementation of find_interest_buses
+    n = etrago.network.copy()
+    nuts = gpd.read_file(etrago.args["nuts_3_map"])
+    area = nuts[nuts["NUTS_NAME"].str.contains("|".join(etrago.args["interest_area"]))]
+    buses = gpd.GeoDataFrame(n.buses.copy(), geometry=gpd.points_from_xy(n.buses.x, n.buses.y),
+                             crs="EPSG:4326").to_crs(area.crs)
+    return buses[buses.geometry.within(area.unary_union)]
+
+
+def _query_read_only(etrago):
+    from plot_comps import find_interest_buses
+
+    etrago._interest_buses_cache = None
+    return find_interest_buses(etrago)
+
+
+def _run(variant, options, queue):
+    network = _load(options)
+    etrago = BenchEtrago(network, bench_args())
+    rss_before = _max_rss_mb()
+    start = time.perf_counter()
+    query = _query_with_copy if variant == "copy" else _query_read_only
+    buses = query(etrago)
+    elapsed = time.perf_counter() - start
+    queue.put((variant, sorted(buses.index), elapsed, rss_before, _max_rss_mb()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--csv-folder", default=None)
+    parser.add_argument("--n-sites", type=int, default=300)
+    parser.add_argument("--n-snapshots", type=int, default=8760)
+    options = vars(parser.parse_args())
+
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    print(f"{'variant':<10} {'buses':>6} {'time [s]':>9} {'RSS net [MB]':>13} {'peak +[MB]':>11}")
+    bus_sets = {}
+    for variant in ["copy", "read_only"]:
+        proc = ctx.Process(target=_run, args=(variant, options, queue))
+        proc.start()
+        name, buses, elapsed, rss_before, rss_after = queue.get()
+        proc.join()
+        bus_sets[name] = buses
+        print(f"{name:<10} {len(buses):>6} {elapsed:>9.2f} {rss_before:>13.0f} {rss_after - rss_before:>11.0f}")
+
+    assert bus_sets["copy"], "interest-area query returned no buses"
+    assert bus_sets["copy"] == bus_sets["read_only"], "copy and read-only query differ"
+    print("interest buses copy == read_only: ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: loading a result folder from CSV vs. from the Parquet cache.
+
+Usage
+-----
+python benchmarks/bench_network_loading.py                        # synthetic network
+python benchmarks/bench_network_loading.py --csv-folder <etrago_results/...>
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+import pypsa
+
+from synthetic_network import synthetic_network
+from network_loader import build_cache, cache_folder, load_network
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--csv-folder", default=None)
+    parser.add_argument("--n-sites", type=int, default=300)
+    parser.add_argument("--n-snapshots", type=int, default=8760)
+    options = parser.parse_args()
+
+    tmp_dir = None
+    csv_folder = options.csv_folder
+    if csv_folder is None:
+        tmp_dir = tempfile.mkdtemp()
+        csv_folder = os.path.join(tmp_dir, "synthetic")
+        synthetic_network(n_sites=options.n_sites, n_snapshots=options.n_snapshots).export_to_csv_folder(csv_folder)
+
+    try:
+        shutil.rmtree(cache_folder(csv_folder), ignore_errors=True)
+
+        network, t_csv = _timed(lambda: pypsa.Network(csv_folder))
+        _, t_build = _timed(lambda: build_cache(csv_folder))
+        cached, t_cached = _timed(lambda: load_network(csv_folder, cache=True))
+
+        size_csv = sum(os.path.getsize(os.path.join(csv_folder, f))
+                       for f in os.listdir(csv_folder) if f.endswith(".csv"))
+        folder = cache_folder(csv_folder)
+        size_cache = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder))
+
+        print(f"buses: {len(network.buses)}, links: {len(network.links)}, snapshots: {len(network.snapshots)}")
+        print(f"CSV load        : {t_csv:8.2f} s  ({size_csv / 1e6:.1f} MB)")
+        print(f"cache build     : {t_build:8.2f} s  (once per folder)")
+        print(f"cached load     : {t_cached:8.2f} s  ({size_cache / 1e6:.1f} MB)")
+        print(f"speed-up        : {t_csv / t_cached:8.1f} x")
+
+        # sanity check: identical time series
+        for list_name, attr in [("links", "p0"), ("generators", "p"), ("loads", "p_set")]:
+            pd.testing.assert_frame_equal(
+                getattr(network, f"{list_name}_t")[attr],
+                getattr(cached, f"{list_name}_t")[attr],
+                check_names=False, check_freq=False,
+            )
+        print("time series CSV == cached: ok")
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
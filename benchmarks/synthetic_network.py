@@ -0,0 +1,180 @@
+"""
+Synthetic eTraGo-like PyPSA networks for the benchmarks in this folder.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pypsa
+
+# make the repository modules importable when running `python benchmarks/...`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from energy_index import CumulativeEnergyIndex
+from network_access import time_series
+from plot_comps import (
+    find_bus_regions,
+    find_interest_buses,
+    find_links_connected_to_interest_buses
+)
+
+BUS_CARRIERS = ["AC", "CH4", "H2_grid", "central_heat", "rural_heat", "Li_ion"]
+LINK_CARRIERS = ["central_heat_pump", "rural_heat_pump", "power_to_H2", "OCGT",
+                 "central_gas_CHP", "central_gas_CHP_heat", "central_gas_boiler", "H2_to_power"]
+GENERATOR_CARRIERS = ["solar", "wind_onshore", "run_of_river", "load shedding"]
+# (x_min, x_max, y_min, y_max) inside the NUTS-3 region Ingolstadt, the
+# default interest area of bench_args
+INTEREST_BOUNDS = (11.33, 11.42, 48.73, 48.78)
+
+
+def synthetic_network(n_sites=100, n_snapshots=8760, colocated=True, with_series=True, seed=0,
+                      interest_share=0.05):
+    """
+    Builds a random network with eTraGo-like carriers and coordinates in Germany.
+
+    Parameters
+    ----------
+    n_sites : int
+        Number of locations. With ``colocated`` every location holds one bus per
+        carrier in BUS_CARRIERS (as after eTraGo clustering).
+    n_snapshots : int
+        Number of hourly snapshots.
+    colocated : bool
+        Place buses of all carriers on identical coordinates.
+    with_series : bool
+        Fill the dispatch time series (links_t.p0/p1, lines_t.p0, generators_t.p,
+        storage_units_t.p, loads_t.p_set, buses_t.marginal_price).
+    seed : int
+        Seed of the random generator.
+    interest_share : float
+        Share of the locations placed inside INTEREST_BOUNDS (at least one
+        if > 0), so that interest-area queries return buses.
+
+    Returns
+    -------
+    pypsa.Network
+    """
+    rng = np.random.default_rng(seed)
+    network = pypsa.Network()
+    network.set_snapshots(pd.date_range("2011-01-01", periods=n_snapshots, freq="h"))
+
+    x = rng.uniform(6.0, 15.0, n_sites)
+    y = rng.uniform(47.5, 54.8, n_sites)
+    n_interest = min(n_sites, max(1, round(interest_share * n_sites))) if interest_share > 0 else 0
+    x[:n_interest] = rng.uniform(*INTEREST_BOUNDS[:2], n_interest)
+    y[:n_interest] = rng.uniform(*INTEREST_BOUNDS[2:], n_interest)
+
+    if colocated:
+        carriers = np.repeat(BUS_CARRIERS, n_sites)
+        bus_x = np.tile(x, len(BUS_CARRIERS))
+        bus_y = np.tile(y, len(BUS_CARRIERS))
+    else:
+        carriers = rng.choice(BUS_CARRIERS, n_sites)
+        bus_x, bus_y = x, y
+    buses = [f"{i}" if c == "AC" else f"{i} {c}" for i, c in enumerate(carriers)]
+    network.madd("Bus", buses, x=bus_x, y=bus_y, carrier=carriers)
+
+    n_links = 2 * len(buses)
+    links = [f"L{i}" for i in range(n_links)]
+    network.madd(
+        "Link", links,
+        bus0=rng.choice(buses, n_links), bus1=rng.choice(buses, n_links),
+        carrier=rng.choice(LINK_CARRIERS, n_links),
+        p_nom_extendable=rng.random(n_links) < 0.7,
+        p_nom_opt=rng.uniform(0, 500, n_links),
+    )
+
+    ac_buses = [b for b, c in zip(buses, carriers) if c == "AC"]
+    n_lines = 2 * len(ac_buses)
+    lines = [f"Line{i}" for i in range(n_lines)]
+    network.madd(
+        "Line", lines,
+        bus0=rng.choice(ac_buses, n_lines), bus1=rng.choice(ac_buses, n_lines),
+        x=0.1, s_nom=1000.0, s_max_pu=rng.uniform(0.5, 1.0, n_lines),
+    )
+
+    n_gens = len(buses)
+    gens = [f"G{i}" for i in range(n_gens)]
+    network.madd(
+        "Generator", gens,
+        bus=rng.choice(buses, n_gens), carrier=rng.choice(GENERATOR_CARRIERS, n_gens),
+        p_nom_extendable=rng.random(n_gens) < 0.7, p_nom_opt=rng.uniform(0, 300, n_gens),
+    )
+
+    storage = [f"S{i}" for i in range(len(ac_buses))]
+    network.madd(
+        "StorageUnit", storage, bus=ac_buses, carrier="battery",
+        p_nom_extendable=True, p_nom_opt=rng.uniform(0, 100, len(storage)),
+    )
+
+    stores = [f"{b} store" for b in buses]
+    network.madd(
+        "Store", stores, bus=buses, carrier=[f"{c}_store" for c in carriers],
+        e_nom_extendable=True, e_nom_opt=rng.uniform(0, 1000, len(stores)),
+    )
+
+    loads = [f"{b} load" if c == "AC" else f"{b}" for b, c in zip(buses, carriers)]
+    network.madd("Load", loads, bus=buses, carrier=carriers)
+
+    if with_series:
+        snapshots = network.snapshots
+
+        def random_frame(columns, low=-100.0, high=100.0):
+            return pd.DataFrame(rng.uniform(low, high, (len(snapshots), len(columns))),
+                                index=snapshots, columns=columns)
+
+        network.import_series_from_dataframe(random_frame(links), "Link", "p0")
+        network.import_series_from_dataframe(random_frame(links), "Link", "p1")
+        network.import_series_from_dataframe(random_frame(lines), "Line", "p0")
+        network.import_series_from_dataframe(random_frame(gens, 0.0), "Generator", "p")
+        network.import_series_from_dataframe(random_frame(storage), "StorageUnit", "p")
+        network.import_series_from_dataframe(random_frame(loads, 0.0), "Load", "p_set")
+        network.import_series_from_dataframe(random_frame(buses, 0.0), "Bus", "marginal_price")
+
+    return network
+
+
+class BenchEtrago:
+    """
+    Minimal stand-in for Etrago1 that wraps an already built network.
+    """
+
+    def __init__(self, network, args):
+        self.network = network
+        self.args = args
+        self.name = args.get("name", "benchmark")
+        self._interest_buses_cache = {}
+        self._bus_regions_cache = {}
+        self._interest_results_cache = {}
+
+    def time_series(self, list_name, attr, columns=None):
+        return time_series(self.network, list_name, attr, columns)
+
+    def energy_index(self, list_name, attr, columns=None):
+        return CumulativeEnergyIndex(self.time_series(list_name, attr, columns))
+
+    # same bindings as in Etrago1, used by interest_area_results
+    find_interest_buses = find_interest_buses
+
+    find_bus_regions = find_bus_regions
+
+    find_links_connected_to_interest_buses = find_links_connected_to_interest_buses
+
+
+def bench_args(nuts_3_map=None, interest_area=("Ingolstadt",)):
+    """
+    Returns an args dict like in base_main.py for benchmark runs.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return {
+        "nuts_3_map": nuts_3_map or os.path.join(root, "germany-de-nuts-3-regions.geojson"),
+        "interest_area": list(interest_area),
+        "name": "benchmark",
+        "plot_settings": {
+            "plot_comps_of_interest": False,
+            "bussize": 10,
+            "linkwidth": 5,
+            "linewidth": 3,
+        },
+    }
@@ -0,0 +1,143 @@
+"""
+Assignment of network buses to NUTS-3 regions.
+
+All buses are assigned in one spatial join against the R-tree index of the
+NUTS-3 regions. Interest-area filtering then reduces to a lookup of region
+names instead of a point-in-polygon test per query.
+
+The assignment can be persisted as a sidecar file in a ``.bus_regions``
+folder inside the eTraGo result folder (like the ``.parquet_cache``). The
+file name contains a hash of the bus coordinates and of the GeoJSON, so a
+changed topology or GeoJSON never reuses an outdated assignment.
+"""
+import hashlib
+import logging
+import os
+
+import geopandas as gpd
+import pandas as pd
+
+from geometry_cache import load_nuts, file_sha256
+
+logger = logging.getLogger(__name__)
+
+# sidecar folder, created inside the csv_folder of a scenario
+SIDECAR_FOLDER = ".bus_regions"
+
+
+def assign_bus_regions(buses, nuts_3_map, region_column="NUTS_NAME"):
+    """
+    Assigns every bus to the NUTS-3 region it lies in.
+
+    Parameters
+    ----------
+    buses : pd.DataFrame
+        Bus table with columns 'x' and 'y' in EPSG:4326 (e.g. network.buses).
+    nuts_3_map : str
+        Path to the NUTS-3 GeoJSON.
+    region_column : str
+        Column of the GeoJSON used as region label.
+
+    Returns
+    -------
+    pd.Series
+        Categorical Series indexed by bus name, NaN for buses outside all regions.
+    """
+    nuts = load_nuts(nuts_3_map)
+    regions = nuts.loc[~nuts.geometry.is_empty & nuts.geometry.notnull(), [region_column, "geometry"]]
+
+    points = gpd.GeoDataFrame(
+        index=buses.index,
+        geometry=gpd.points_from_xy(buses["x"], buses["y"]),
+        crs="EPSG:4326"
+    ).to_crs(nuts.crs)
+
+    # one join against the spatial index of all regions
+    joined = gpd.sjoin(points, regions, how="left", predicate="within")
+    # a point on a shared border may match two regions -> keep the first one
+    joined = joined[~joined.index.duplicated(keep="first")]
+
+    dtype = pd.CategoricalDtype(categories=pd.unique(regions[region_column]))
+    return joined[region_column].reindex(buses.index).astype(dtype).rename("region")
+
+
+def buses_in_regions(bus_regions, regions):
+    """
+    Returns the names of all buses located in one of ``regions``,
+    in the order of ``bus_regions``.
+
+    Parameters
+    ----------
+    bus_regions : pd.Series
+        Result of assign_bus_regions.
+    regions : list-like
+        Region names.
+
+    Returns
+    -------
+    pd.Index
+    """
+    return bus_regions.index[bus_regions.isin(list(regions))]
+
+
+def bus_regions_hash(buses, nuts_3_map):
+    """
+    Returns a hash of the bus coordinates (index, x, y) and the GeoJSON content.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(buses[["x", "y"]], index=True).values.tobytes())
+    digest.update(file_sha256(nuts_3_map).encode())
+    return digest.hexdigest()[:16]
+
+
+def sidecar_path(csv_folder, buses, nuts_3_map):
+    """
+    Returns the path of the bus-region sidecar file for a scenario folder.
+    """
+    return os.path.join(csv_folder, SIDECAR_FOLDER, f"bus_regions_{bus_regions_hash(buses, nuts_3_map)}.pkl")
+
+
+def load_or_assign_bus_regions(buses, nuts_3_map, csv_folder=None):
+    """
+    Returns the bus-region assignment, read from the sidecar file of
+    ``csv_folder`` if present, otherwise computed and written to it.
+
+    Parameters
+    ----------
+    buses : pd.DataFrame
+        Bus table with columns 'x' and 'y' in EPSG:4326.
+    nuts_3_map : str
+        Path to the NUTS-3 GeoJSON.
+    csv_folder : str, optional
+        eTraGo result folder. Without it nothing is persisted.
+
+    Returns
+    -------
+    pd.Series
+        See assign_bus_regions.
+    """
+    if csv_folder is None:
+        return assign_bus_regions(buses, nuts_3_map)
+
+    path = sidecar_path(csv_folder, buses, nuts_3_map)
+    if os.path.exists(path):
+        try:
+            bus_regions = pd.read_pickle(path)
+            logger.debug(f"Bus-Regionen aus {path} geladen")
+            return bus_regions
+        except Exception as e:
+            logger.warning(f"Bus-Regionen-Datei {path} nicht lesbar, wird neu erstellt: {e}")
+
+    bus_regions = assign_bus_regions(buses, nuts_3_map)
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first, parallel runs may open the same scenario
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        bus_regions.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        logger.info(f"Bus-Regionen gespeichert unter: {path}")
+    except OSError as e:
+        logger.warning(f"Bus-Regionen konnten nicht gespeichert werden: {e}")
+
+    return bus_regions
@@ -16,41 +16,43 @@ from plot_comps import(
     find_interest_buses,
     find_links_connected_to_interest_buses
 )
+from network_access import components_at_buses
 
 #path_to_results = "pypsa_results/2025-04-18_etrago_test_set4_appl.log"
 
 def capacities_opt(etrago,scn = "Base_scn"):
-    network = etrago.network.copy()
+    # read-only access, no network.copy() required
+    network = etrago.network
 
     # === optimized links ===
     # optimized links - global
     links_opt = network.links[network.links.p_nom_extendable == True]
-    links_opt_cap = links_opt.groupby("carrier")["p_nom_opt"].sum().rename(scn)
+    links_opt_cap = links_opt.groupby("carrier", observed=True)["p_nom_opt"].sum().rename(scn)
 
     # optimized links - interest
     connected_links = find_links_connected_to_interest_buses(etrago)
     connected_links_optimized = connected_links[connected_links.p_nom_extendable == True]
-    links_ing_opt_cap = connected_links_optimized.groupby("carrier")["p_nom_opt"].sum().rename(scn)
+    links_ing_opt_cap = connected_links_optimized.groupby("carrier", observed=True)["p_nom_opt"].sum().rename(scn)
 
     # === optimized stores ===
     # optimized stores - global
     stores_opt = network.stores[network.stores.e_nom_extendable == True]
-    stores_opt_cap = stores_opt.groupby("carrier")["e_nom_opt"].sum().rename(scn)
+    stores_opt_cap = stores_opt.groupby("carrier", observed=True)["e_nom_opt"].sum().rename(scn)
 
     # optimized stores - interest
     buses_interest_area = find_interest_buses(etrago)
     bus_list = buses_interest_area.index.tolist()
-    stores_ing = network.stores[network.stores["bus"].isin(bus_list)]
+    stores_ing = components_at_buses(network, "stores", bus_list)
     stores_ing_opt = stores_ing[stores_ing.e_nom_extendable == True]
-    stores_ing_opt_cap = stores_ing_opt.groupby("carrier")["e_nom_opt"].sum().rename(scn)
+    stores_ing_opt_cap = stores_ing_opt.groupby("carrier", observed=True)["e_nom_opt"].sum().rename(scn)
 
     # === optimized storage_units ===
     # optimized storage_units - global
     storage_units_opt = network.storage_units[network.storage_units.p_nom_extendable == True]
-    storage_units_opt_cap = storage_units_opt.groupby("carrier")["p_nom_opt"].sum().rename(scn)
+    storage_units_opt_cap = storage_units_opt.groupby("carrier", observed=True)["p_nom_opt"].sum().rename(scn)
     # optimized storage_units - interest
     storage_units_ing_opt = storage_units_opt[storage_units_opt.bus.isin(bus_list)]
-    storage_units_ing_opt_cap = storage_units_ing_opt.groupby("carrier")["p_nom_opt"].sum().rename(scn)
+    storage_units_ing_opt_cap = storage_units_ing_opt.groupby("carrier", observed=True)["p_nom_opt"].sum().rename(scn)
 
     # === collect capacities ===
     capacities_opt = pd.concat([links_opt_cap, stores_opt_cap, storage_units_opt_cap], axis=0)
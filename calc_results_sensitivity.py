@@ -14,4 +14,6 @@ def get_marginal_price_series(etrago, bus_id):
     -------
     pd.Series
     """
-    return etrago.network.buses_t.marginal_price[bus_id]
\ No newline at end of file
+    # copy: a column view would keep the whole marginal_price frame of the
+    # network alive as long as the series is retained
+    return etrago.network.buses_t.marginal_price[bus_id].copy()
\ No newline at end of file
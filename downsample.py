@@ -0,0 +1,153 @@
+"""
+Visually lossless downsampling of long time series for line and area plots.
+
+Both methods return *positions* of snapshots to keep, so several series
+(e.g. the stacked carriers of a dispatch plot and the load) can be reduced
+to one common set of snapshots and still stack correctly.
+
+- ``minmax``: per bucket the minimum and maximum sample, so the drawn
+  envelope (peaks and troughs) matches the full series.
+- ``lttb``: Largest-Triangle-Three-Buckets, one sample per bucket chosen to
+  preserve the visual shape.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _bucket_edges(n, n_buckets):
+    return np.linspace(0, n, n_buckets + 1).astype(int)
+
+
+def minmax_indices(values, n_buckets):
+    """
+    Positions of the min and max sample per bucket (plus first and last sample).
+
+    Parameters
+    ----------
+    values : np.ndarray
+        1D array or 2D array (samples x series); for 2D the envelopes of all
+        series are combined.
+    n_buckets : int
+
+    Returns
+    -------
+    np.ndarray
+        Sorted unique positions.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    n = len(values)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    # pad to equally sized buckets: buckets x size x series
+    size = int(np.ceil(n / n_buckets))
+    padded = np.full((n_buckets * size, values.shape[1]), np.nan)
+    padded[:n] = values
+    padded = padded.reshape(n_buckets, size, values.shape[1])
+
+    filled = ~np.isnan(padded).all(axis=(1, 2))
+    offsets = (np.arange(n_buckets) * size)[:, None]
+    maxima = np.nanargmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    minima = np.nanargmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+
+    positions = np.concatenate([
+        maxima[filled].ravel(),
+        minima[filled].ravel(),
+        [0, n - 1],
+    ])
+    return np.unique(positions[positions < n])
+
+
+def lttb_indices(values, n_out):
+    """
+    Positions selected by Largest-Triangle-Three-Buckets for a 1D series.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        1D array, sampled at equidistant positions.
+    n_out : int
+        Number of samples to keep (including first and last).
+
+    Returns
+    -------
+    np.ndarray
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=np.float64)
+    # inner buckets between the fixed first and last sample
+    edges = _bucket_edges(n - 2, n_out - 2) + 1
+    positions = np.empty(n_out, dtype=np.int64)
+    positions[0], positions[-1] = 0, n - 1
+
+    selected = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = values[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], values[-1]
+
+        # area of the triangle (selected, candidate, mean of the next bucket)
+        area = np.abs(
+            (x[selected] - next_x) * (values[start:stop] - values[selected])
+            - (x[selected] - x[start:stop]) * (next_y - values[selected])
+        )
+        selected = start + int(np.argmax(area))
+        positions[i + 1] = selected
+    return positions
+
+
+def downsample_frame(frame, max_points, method="minmax", extra=None):
+    """
+    Reduces a frame (and optional further series) to common snapshots.
+
+    The snapshots are selected from the total of ``frame`` (the upper
+    envelope of a stacked area plot) and the ``extra`` series (overlaid
+    lines), so their peaks stay visible. All series keep the same snapshots
+    and still stack correctly.
+
+    Parameters
+    ----------
+    frame : pd.DataFrame
+        Time series (snapshots x series).
+    max_points : int
+        Approximate number of snapshots to keep, e.g. the figure's width in pixels.
+    method : str
+        'minmax' or 'lttb'.
+    extra : list of pd.Series, optional
+        Further series on the same index (e.g. the load line).
+
+    Returns
+    -------
+    pd.DataFrame, list of pd.Series
+        Downsampled frame and extra series.
+    """
+    extra = list(extra or [])
+    if len(frame) <= max_points:
+        return frame, extra
+
+    series = np.column_stack(
+        [frame.sum(axis=1).to_numpy(dtype=np.float64)]
+        + [s.reindex(frame.index).fillna(0).to_numpy(dtype=np.float64) for s in extra]
+    )
+    if method == "minmax":
+        # min and max per bucket and series, shared buckets for all series
+        positions = minmax_indices(series, max(1, max_points // (2 * series.shape[1])))
+    elif method == "lttb":
+        n_out = max(3, max_points // series.shape[1])
+        positions = np.unique(np.concatenate(
+            [lttb_indices(series[:, i], n_out) for i in range(series.shape[1])]
+        ))
+    else:
+        raise ValueError(f"Unknown downsampling method '{method}', expected 'minmax' or 'lttb'.")
+
+    index = frame.index[positions]
+    return frame.iloc[positions], [s.reindex(index) for s in extra]
@@ -0,0 +1,89 @@
+"""
+Cumulative-sum index for energy sums over arbitrary time windows.
+
+For every component the cumulative sums of the positive and of the negative
+part of a time series are stored once (with a leading zero row). The energy
+of any window ``slice(start, stop)`` is then the difference of two rows,
+independent of the window length, and all periods of a monthly or weekly
+breakdown are computed in one vectorised step.
+"""
+import numpy as np
+import pandas as pd
+
+
+class CumulativeEnergyIndex:
+    """
+    Cumulative sums of the positive and negative part of a time-series frame.
+
+    Parameters
+    ----------
+    frame : pd.DataFrame
+        Time series (snapshots x components), e.g. links_t.p1.
+    """
+
+    def __init__(self, frame):
+        self.index = frame.index
+        self.columns = frame.columns
+        values = frame.to_numpy(dtype=np.float64)
+        zero = np.zeros((1, values.shape[1]))
+        self.positive = np.vstack([zero, np.cumsum(np.clip(values, 0, None), axis=0)])
+        self.negative = np.vstack([zero, np.cumsum(np.clip(values, None, 0), axis=0)])
+
+    def _cumulative(self, part):
+        if part == "positive":
+            return self.positive
+        if part == "negative":
+            return self.negative
+        if part == "net":
+            return self.positive + self.negative
+        raise ValueError(f"Unknown part '{part}', expected 'positive', 'negative' or 'net'.")
+
+    def _positions(self, time):
+        if time is None:
+            return 0, len(self.index)
+        if isinstance(time, slice):
+            indexer = self.index.slice_indexer(time.start, time.stop)
+        else:
+            # partial string like '2011-07' -> all snapshots of that period
+            indexer = self.index.slice_indexer(time, time)
+        return indexer.start or 0, len(self.index) if indexer.stop is None else indexer.stop
+
+    def energy(self, time=None, part="net"):
+        """
+        Returns the sum of each component over a time window.
+
+        Parameters
+        ----------
+        time : str or slice, optional
+            e.g. '2011-07' or slice("2011-05-01", "2011-05-31"); default: all snapshots.
+        part : str
+            'positive', 'negative' (sum of negative values) or 'net'.
+
+        Returns
+        -------
+        pd.Series
+        """
+        start, stop = self._positions(time)
+        cumulative = self._cumulative(part)
+        return pd.Series(cumulative[stop] - cumulative[start], index=self.columns)
+
+    def breakdown(self, freq="M", part="net"):
+        """
+        Returns the sums per period (e.g. month 'M', week 'W') for all components.
+
+        Returns
+        -------
+        pd.DataFrame
+            Index: periods, columns: components.
+        """
+        periods = self.index.to_period(freq)
+        changes = np.flatnonzero(periods[1:] != periods[:-1]) + 1
+        starts = np.concatenate([[0], changes])
+        stops = np.concatenate([changes, [len(self.index)]])
+
+        cumulative = self._cumulative(part)
+        return pd.DataFrame(
+            cumulative[stops] - cumulative[starts],
+            index=periods[starts],
+            columns=self.columns
+        )
@@ -0,0 +1,259 @@
+"""
+Process-wide cache for the NUTS-3 GeoJSON.
+
+Each GeoJSON is parsed once per process and kept in every CRS that is
+requested (EPSG:4258 as stored, EPSG:4326 for folium, EPSG:3857 for metric
+operations). Unions of the regions selected by an interest_area filter are
+computed once per file, filter and CRS.
+
+Optionally the parsed file is written to an on-disk GeoParquet cache keyed by
+the SHA-256 of the GeoJSON, so that cold starts skip the GeoJSON parser.
+This requires pyarrow; without it the disk cache is silently skipped.
+
+For web maps, map_layer returns a lighter copy of the regions: simplified
+to the resolution of a zoom level, with quantized coordinates and only the
+properties needed for tooltips; to_topojson optionally encodes it as
+TopoJSON with shared borders (requires the ``topojson`` package).
+
+The returned GeoDataFrames are shared between all callers and must not be
+modified in place.
+"""
+import hashlib
+import logging
+import os
+
+import geopandas as gpd
+import shapely
+
+logger = logging.getLogger(__name__)
+
+# default folder of the on-disk cache, relative to the GeoJSON
+DISK_CACHE_FOLDER = ".geometry_cache"
+
+# (path, mtime, size) -> {crs: GeoDataFrame}
+_nuts_cache = {}
+# (path, mtime, size, area filter, crs) -> (GeoDataFrame of regions, union geometry)
+_interest_cache = {}
+# (path, mtime, size, zoom, precision, columns) -> GeoDataFrame for web maps
+_map_layer_cache = {}
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_key(path):
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _normalize_area_filter(area_filter):
+    if isinstance(area_filter, str):
+        return (area_filter,)
+    return tuple(area_filter)
+
+
+def _read_nuts(path, disk_cache):
+    """
+    Reads the GeoJSON, optionally through the GeoParquet disk cache.
+    """
+    cache_file = None
+    if disk_cache:
+        cache_folder = os.path.join(os.path.dirname(os.path.abspath(path)), DISK_CACHE_FOLDER)
+        name = os.path.splitext(os.path.basename(path))[0]
+        cache_file = os.path.join(cache_folder, f"{name}_{file_sha256(path)[:16]}.parquet")
+
+        if os.path.exists(cache_file):
+            try:
+                return gpd.read_parquet(cache_file)
+            except Exception as e:  # pyarrow missing or file damaged
+                logger.debug(f"GeoParquet-Cache {cache_file} nicht lesbar: {e}")
+
+    nuts = gpd.read_file(path)
+    nuts["NUTS_NAME"] = nuts["NUTS_NAME"].str.strip()
+
+    if cache_file is not None:
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            nuts.to_parquet(cache_file)
+        except Exception as e:
+            logger.debug(f"GeoParquet-Cache {cache_file} nicht geschrieben: {e}")
+
+    return nuts
+
+
+def load_nuts(path, crs=None, disk_cache=True):
+    """
+    Returns the NUTS-3 regions of ``path``, parsed only once per process.
+
+    Parameters
+    ----------
+    path : str
+        Path to the NUTS-3 GeoJSON.
+    crs : str or int, optional
+        Target CRS (e.g. "EPSG:4326"). Default: CRS of the file.
+    disk_cache : bool
+        Use the on-disk GeoParquet cache next to the GeoJSON.
+
+    Returns
+    -------
+    GeoDataFrame
+        Shared object, do not modify in place.
+    """
+    key = _file_key(path)
+    by_crs = _nuts_cache.get(key)
+    if by_crs is None:
+        # file changed or read for the first time
+        for old_key in [k for k in _nuts_cache if k[0] == key[0]]:
+            del _nuts_cache[old_key]
+        by_crs = {None: _read_nuts(path, disk_cache)}
+        _nuts_cache[key] = by_crs
+
+    if crs not in by_crs:
+        by_crs[crs] = by_crs[None].to_crs(crs)
+
+    return by_crs[crs]
+
+
+def interest_regions(path, area_filter, crs=None):
+    """
+    Returns the regions whose NUTS_NAME contains one of the fragments in
+    ``area_filter`` (case-insensitive) together with their union.
+
+    Parameters
+    ----------
+    path : str
+        Path to the NUTS-3 GeoJSON.
+    area_filter : list of str
+        Name fragments, e.g. args["interest_area"].
+    crs : str or int, optional
+        Target CRS. Default: CRS of the file.
+
+    Returns
+    -------
+    tuple(GeoDataFrame, shapely geometry)
+        Selected regions (without empty geometries) and their union.
+    """
+    area_key = _normalize_area_filter(area_filter)
+    key = _file_key(path) + (area_key, crs)
+    if key not in _interest_cache:
+        nuts = load_nuts(path, crs=crs)
+        mask = nuts["NUTS_NAME"].apply(lambda name: any(area.lower() in name.lower() for area in area_key))
+        regions = nuts[mask]
+        regions = regions[~regions.geometry.is_empty & regions.geometry.notnull()]
+        union = regions.unary_union if not regions.empty else None
+        _interest_cache[key] = (regions, union)
+
+    return _interest_cache[key]
+
+
+def zoom_tolerance(zoom):
+    """
+    Returns half the edge length of a web-map pixel at ``zoom`` in degrees;
+    simplification below this tolerance is not visible at that zoom level.
+    """
+    return 360.0 / (256 * 2 ** zoom) / 2
+
+
+def _simplify(geometries, tolerance):
+    # coverage simplification keeps shared borders of neighbouring regions
+    # identical (shapely >= 2.1 with GEOS >= 3.12), otherwise per polygon
+    if hasattr(shapely, "coverage_simplify"):
+        try:
+            coverage = shapely.coverage_simplify(shapely.geometrycollections(geometries), tolerance)
+            parts = shapely.get_parts(coverage)
+            if len(parts) == len(geometries):
+                return parts
+        except Exception as e:  # GEOS too old or invalid coverage
+            logger.debug(f"coverage_simplify nicht verfügbar: {e}")
+    return shapely.simplify(geometries, tolerance, preserve_topology=True)
+
+
+def map_layer(path, zoom=9, precision=4, columns=("NUTS_NAME",)):
+    """
+    Returns the NUTS-3 regions prepared for embedding into web maps.
+
+    Parameters
+    ----------
+    path : str
+        Path to the NUTS-3 GeoJSON.
+    zoom : int or None
+        Simplify to the resolution of this zoom level (see zoom_tolerance).
+        None keeps the full-precision geometries.
+    precision : int or None
+        Decimal places of the coordinates (4 ~ 10 m); None keeps all.
+    columns : tuple of str
+        Properties to keep, e.g. for tooltips.
+
+    Returns
+    -------
+    GeoDataFrame
+        In EPSG:4326. Shared object, do not modify in place.
+    """
+    key = _file_key(path) + (zoom, precision, tuple(columns))
+    if key not in _map_layer_cache:
+        nuts = load_nuts(path, crs="EPSG:4326")
+        geometries = nuts.geometry.to_numpy()
+
+        if zoom is not None:
+            geometries = _simplify(geometries, zoom_tolerance(zoom))
+        if precision is not None:
+            geometries = shapely.set_precision(geometries, 10.0 ** -precision)
+
+        layer = gpd.GeoDataFrame(nuts[list(columns)].copy(), geometry=geometries, crs=nuts.crs)
+        _map_layer_cache[key] = layer[~layer.geometry.is_empty]
+
+    return _map_layer_cache[key]
+
+
+def regions_in_bounds(layer, bounds, margin=0.0):
+    """
+    Returns the regions of ``layer`` that intersect a bounding box, using the
+    spatial index of the layer.
+
+    Parameters
+    ----------
+    layer : GeoDataFrame
+        e.g. the result of map_layer.
+    bounds : array_like
+        (minx, miny, maxx, maxy) in the CRS of ``layer``.
+    margin : float
+        Added on every side of the box, in units of the CRS (degrees for EPSG:4326).
+
+    Returns
+    -------
+    GeoDataFrame
+    """
+    minx, miny, maxx, maxy = bounds
+    box = shapely.box(minx - margin, miny - margin, maxx + margin, maxy + margin)
+    positions = layer.sindex.query(box, predicate="intersects")
+    return layer.iloc[sorted(positions)]
+
+
+def to_topojson(layer, quantization=1e5):
+    """
+    Encodes a map layer as TopoJSON; borders shared by two regions are stored once.
+
+    Requires the optional ``topojson`` package.
+
+    Returns
+    -------
+    dict
+        TopoJSON topology with the object "data" (folium.TopoJson object_path "objects.data").
+
+    Raises
+    ------
+    ImportError
+        If ``topojson`` is not installed.
+    """
+    import topojson
+
+    return topojson.Topology(layer, prequantize=quantization).to_dict()
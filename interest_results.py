@@ -0,0 +1,225 @@
+"""
+Single-pass evaluation of the interest area.
+
+InterestAreaResults builds the component selection of the interest area
+once (interest buses, connected links, waste/charger filters) and reads
+each time-series frame only once for the union of all components needed.
+The capacity and generation tables used by the bar plots and by the
+sensitivity comparison are derived from these aggregates.
+"""
+import pandas as pd
+
+from carrier_aggregation import CarrierAggregator
+from network_access import components_at_buses
+from plot_comps import cached_on_etrago, interest_cache_key
+
+WASTE_CARRIERS = ["central_waste_CHP", "central_waste_CHP_heat"]
+CHARGER_CARRIERS = [
+    "rural_heat_store_charger",
+    "rural_heat_store_discharger",
+    "central_heat_store_charger",
+    "central_heat_store_discharger"
+]
+
+
+class InterestAreaResults:
+    """
+    Capacities and energy aggregates of the interest area.
+
+    Attributes
+    ----------
+    buses : GeoDataFrame
+        Buses in the interest area.
+    bus_ids : dict
+        Bus carrier ('AC', 'central_heat', 'rural_heat') -> list of bus names.
+    connected_links : pd.DataFrame
+        Links with bus0 or bus1 in the interest area.
+    links_on_cH, links_from_cH : pd.DataFrame
+        Links dispatching into / charging from the central heat buses.
+    loads : pd.DataFrame
+        Loads in the interest area.
+    selection : dict
+        Components per generation term, e.g. 'links_elec', 'gens_dh', 'batteries', 'lines'.
+    aggregators : dict
+        CarrierAggregator per component group, built once for the selection:
+        'links' and 'generators' group the generation terms by
+        ('bus_carrier', 'carrier'), 'links_on_cH' and 'links_from_cH' by carrier.
+    capacities : pd.DataFrame
+        Columns: 'carrier', 'Capacity' (see capacities_opt_ing).
+    generation : pd.DataFrame
+        Tidy table with columns 'bus_carrier', 'carrier', 'generation'.
+    """
+
+    def __init__(self, etrago):
+        network = etrago.network
+
+        # === selection (once) ===
+        self.buses = etrago.find_interest_buses()
+        bus_list = self.buses.index.to_list()
+        self.bus_ids = {
+            carrier: self.buses[self.buses.carrier == carrier].index.to_list()
+            for carrier in ["AC", "central_heat", "rural_heat"]
+        }
+
+        links = etrago.find_links_connected_to_interest_buses()
+        self.connected_links = links
+
+        links_cap = links[(links.p_nom_extendable == True) | (links.carrier.isin(WASTE_CARRIERS))]
+        links_cap = links_cap[~links_cap.carrier.isin(CHARGER_CARRIERS)]
+        links_elec = links_cap[links_cap.bus1.isin(self.bus_ids["AC"])]
+
+        links_ch = links[links.bus1.isin(self.bus_ids["central_heat"])]
+        links_ch = links_ch[(links_ch.p_nom_extendable == True) | (links_ch.carrier == "central_waste_CHP_heat")]
+
+        links_dh = links[(links.bus1.isin(self.bus_ids["rural_heat"])) & (links.p_nom_extendable == True)]
+
+        self.links_on_cH = links[
+            ((links.bus1.isin(self.bus_ids["central_heat"])) & (links.p_nom_extendable == True)) |
+            (links.carrier == "central_waste_CHP_heat")
+        ]
+        self.links_from_cH = links[links.bus0.isin(self.bus_ids["central_heat"])]
+
+        gens = components_at_buses(network, "generators", bus_list)
+        gens = gens[(gens.carrier != "load shedding") & (gens.p_nom_extendable == True)]
+        gens_elec = gens[gens.bus.isin(self.bus_ids["AC"])]
+        gens_dh = gens[gens.bus.isin(self.bus_ids["rural_heat"])]
+
+        batteries = components_at_buses(network, "storage_units", bus_list)
+        stores = components_at_buses(network, "stores", bus_list)
+        stores = stores[stores.e_nom_extendable == True]
+        lines = components_at_buses(network, "lines", bus_list)
+        self.loads = components_at_buses(network, "loads", bus_list)
+
+        self.selection = {
+            "links_elec": links_elec, "links_ch": links_ch, "links_dh": links_dh,
+            "gens_elec": gens_elec, "gens_dh": gens_dh,
+            "batteries": batteries, "lines": lines,
+        }
+
+        # === capacities ===
+        self.capacities = pd.concat([
+            links_cap[["carrier", "p_nom_opt"]].rename(columns={"p_nom_opt": "Capacity"}),
+            gens[["carrier", "p_nom_opt"]].rename(columns={"p_nom_opt": "Capacity"}),
+            batteries[["carrier", "p_nom_opt"]].rename(columns={"p_nom_opt": "Capacity"}),
+            stores[["carrier", "e_nom_opt"]].rename(columns={"e_nom_opt": "Capacity"}),
+        ], ignore_index=True)
+
+        # === aggregators (sparse component -> carrier matrices, once per selection) ===
+        # the generation terms are separated by the carrier of the receiving bus
+        self.aggregators = {
+            "links": CarrierAggregator.by_bus_carrier(
+                pd.concat([links_elec, links_ch, links_dh]), self.buses, "bus1", with_carrier=True
+            ),
+            "generators": CarrierAggregator.by_bus_carrier(
+                pd.concat([gens_elec, gens_dh]), self.buses, "bus", with_carrier=True
+            ),
+            "links_on_cH": CarrierAggregator(self.links_on_cH["carrier"]),
+            "links_from_cH": CarrierAggregator(self.links_from_cH["carrier"]),
+        }
+
+        # === energy: one pass over each time-series frame ===
+        link_agg = self.aggregators["links"]
+        link_energy = link_agg.totals(etrago.time_series("links", "p1", link_agg.components)) * (-1)
+
+        gen_agg = self.aggregators["generators"]
+        gen_energy = gen_agg.totals(etrago.time_series("generators", "p", gen_agg.components))
+
+        # discharge / import: positive resp. negative part from the cumulative-sum
+        # index, shared with generation_breakdown
+        battery_discharge = etrago.energy_index("storage_units", "p", batteries.index).energy(part="positive").sum()
+        electricity_import = etrago.energy_index("lines", "p0", lines.index).energy(part="negative").sum() * (-1)
+
+        storage_and_import = pd.Series(
+            [battery_discharge, electricity_import],
+            index=pd.MultiIndex.from_tuples(
+                [("AC", "battery_discharge"), ("AC", "Stromimport")], names=["bus_carrier", "carrier"]
+            ),
+        )
+
+        # links and generators may share a carrier -> add up per (bus_carrier, carrier)
+        generation = pd.concat([link_energy, gen_energy, storage_and_import])
+        self.generation = (
+            generation
+            .groupby(level=["bus_carrier", "carrier"])
+            .sum()
+            .rename("generation")
+            .reset_index()
+        )
+
+    def generation_by_carrier(self, bus_carrier, value_column="generation"):
+        """
+        Generation into one bus carrier, columns: 'carrier', value_column.
+        """
+        df = self.generation[self.generation.bus_carrier == bus_carrier]
+        return (
+            df[["carrier", "generation"]]
+            .rename(columns={"generation": value_column})
+            .reset_index(drop=True)
+        )
+
+    @property
+    def electricity(self):
+        """Columns: 'carrier', 'generation' (see df_electricity_generation)."""
+        return self.generation_by_carrier("AC", "generation")
+
+    @property
+    def central_heat(self):
+        """Columns: 'carrier', 'generation_cH' (see df_central_heat_generation)."""
+        return self.generation_by_carrier("central_heat", "generation_cH")
+
+    @property
+    def decentral_heat(self):
+        """Columns: 'carrier', 'generation_dH' (see df_decentral_heat_generation)."""
+        return self.generation_by_carrier("rural_heat", "generation_dH")
+
+
+def interest_area_results(etrago):
+    """
+    Returns the InterestAreaResults of an Etrago object, computed once per
+    network and interest area (cached in ``_interest_results_cache``).
+    """
+    return cached_on_etrago(
+        etrago, "_interest_results_cache", interest_cache_key(etrago), InterestAreaResults
+    )
+
+
+def generation_breakdown(etrago, freq="M"):
+    """
+    Returns the generation of the interest area per period (e.g. month 'M',
+    week 'W') by bus carrier and carrier, with the same terms as
+    InterestAreaResults.generation.
+
+    The period sums are taken from cumulative-sum indices (Etrago1.energy_index),
+    so further breakdowns of the same network are two lookups per period.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: 'period', 'bus_carrier', 'carrier', 'generation'.
+    """
+    results = interest_area_results(etrago)
+    selection = results.selection
+    link_agg = results.aggregators["links"]
+    gen_agg = results.aggregators["generators"]
+
+    # period sums per component, then per (bus_carrier, carrier) with the shared aggregators
+    links = link_agg.time_series(etrago.energy_index("links", "p1", link_agg.components).breakdown(freq)) * (-1)
+    gens = gen_agg.time_series(etrago.energy_index("generators", "p", gen_agg.components).breakdown(freq))
+    batteries = etrago.energy_index("storage_units", "p", selection["batteries"].index).breakdown(freq, "positive")
+    lines = etrago.energy_index("lines", "p0", selection["lines"].index).breakdown(freq, "negative") * (-1)
+
+    storage_and_import = pd.DataFrame({
+        ("AC", "battery_discharge"): batteries.sum(axis=1),
+        ("AC", "Stromimport"): lines.sum(axis=1),
+    })
+    storage_and_import.columns.names = ["bus_carrier", "carrier"]
+
+    generation = pd.concat([links, gens, storage_and_import], axis=1).rename_axis(index="period")
+    return (
+        generation
+        .melt(ignore_index=False, value_name="generation")
+        .reset_index()
+        .groupby(["period", "bus_carrier", "carrier"], observed=True)["generation"]
+        .sum()
+        .reset_index()
+    )
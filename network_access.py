@@ -0,0 +1,94 @@
+"""
+Read-only access to the tables of a PyPSA network.
+
+The helpers in this module return views or small selections of the static
+component tables and time series without calling ``network.copy()``, which
+would duplicate every static table and every ``*_t`` time-series frame.
+Returned frames must be treated as read-only; callers that want to modify
+data have to call ``.copy()`` on the (small) result themselves.
+"""
+
+# bus columns per component list, used to find components attached to buses
+BUS_COLUMNS = {
+    "links": ("bus0", "bus1"),
+    "lines": ("bus0", "bus1"),
+    "transformers": ("bus0", "bus1"),
+}
+
+
+def static_table(network, list_name, columns=None):
+    """
+    Returns the static table of a component without copying its data.
+
+    Parameters
+    ----------
+    network : pypsa.Network
+    list_name : str
+        Component list name, e.g. 'buses', 'links', 'generators'.
+    columns : list of str, optional
+        Restrict the table to these columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        Shallow copy (shared data, own column index) or column selection.
+    """
+    df = getattr(network, list_name)
+    if columns is not None:
+        return df.loc[:, list(columns)]
+    # shallow copy: adding columns does not touch the network, values are shared
+    return df.copy(deep=False)
+
+
+def components_at_buses(network, list_name, bus_list, columns=None):
+    """
+    Returns all components of ``list_name`` attached to at least one bus in
+    ``bus_list`` (bus for one-port components, bus0/bus1 for branches).
+
+    Parameters
+    ----------
+    network : pypsa.Network
+    list_name : str
+        Component list name, e.g. 'links', 'stores', 'storage_units'.
+    bus_list : list-like
+        Bus names.
+    columns : list of str, optional
+        Restrict the result to these columns.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    df = getattr(network, list_name)
+    mask = None
+    for bus_col in BUS_COLUMNS.get(list_name, ("bus",)):
+        bus_mask = df[bus_col].isin(bus_list)
+        mask = bus_mask if mask is None else mask | bus_mask
+
+    if columns is not None:
+        return df.loc[mask, list(columns)]
+    return df[mask]
+
+
+def time_series(network, list_name, attr, columns=None):
+    """
+    Returns a time-series frame (e.g. links_t.p0) or a column selection of it.
+
+    Parameters
+    ----------
+    network : pypsa.Network
+    list_name : str
+        Component list name, e.g. 'links'.
+    attr : str
+        Time-series attribute, e.g. 'p0'.
+    columns : list-like, optional
+        Component names to select.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    df = getattr(network, f"{list_name}_t")[attr]
+    if columns is None:
+        return df
+    return df.loc[:, list(columns)]
@@ -0,0 +1,538 @@
+"""
+Loading of eTraGo result folders (PyPSA csv folders) for Etrago1.
+
+Besides the plain ``pypsa.Network(csv_folder)`` the loader offers a binary
+columnar cache: on the first load every CSV of the folder is converted to a
+Parquet file in ``<csv_folder>/.parquet_cache``; later loads read the
+Parquet files instead of parsing text. The cache stores a fingerprint of
+the CSV files (name, size, mtime) and is rebuilt when it no longer matches.
+
+In lazy mode only the static component tables are loaded immediately;
+each time-series frame (``links_t.p0``, ``generators_t.p``, ...) is read
+from disk when it is accessed for the first time.
+
+With a component selection (see select_time_series) only the columns of
+the selected components are read from disk, e.g. only the components
+connected to the interest area. With the Parquet cache this is a real
+column projection; from CSV the file is still scanned but only the selected
+columns are kept in memory.
+
+Loading options are taken from args["load_settings"], e.g.::
+
+    "load_settings": {
+        "cache": True,   # use the Parquet cache
+        "lazy": True,    # load *_t frames on first access
+        "memmap": True,  # dispatch series from the memory-mapped store (timeseries_store.py)
+        "compact": True, # float32 time series, categorical carrier/bus columns
+        "compact_tolerance": 1e-4,
+    },
+
+The cache needs pyarrow; without it the loader falls back to the CSV files.
+"""
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pypsa
+
+try:
+    from pypsa.descriptors import Dict
+except ImportError:  # newer PyPSA versions
+    from pypsa.common import Dict
+
+logger = logging.getLogger(__name__)
+
+CACHE_FOLDER = ".parquet_cache"
+MANIFEST_FILE = "manifest.json"
+
+# bump when the layout of the cache changes
+CACHE_VERSION = 1
+
+# string key columns stored as categoricals in compact mode
+KEY_COLUMNS = ["carrier", "bus", "bus0", "bus1"]
+
+
+def folder_fingerprint(csv_folder):
+    """
+    Returns a fingerprint of all CSV files in a result folder (name, size, mtime).
+    """
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(csv_folder)):
+        if not name.endswith(".csv"):
+            continue
+        stat = os.stat(os.path.join(csv_folder, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def table_names(csv_folder):
+    """
+    Returns the names of all tables (CSV files without extension) in a result folder.
+    """
+    return sorted(name[:-4] for name in os.listdir(csv_folder) if name.endswith(".csv"))
+
+
+def is_time_series(name):
+    """
+    True for time-series tables like 'links-p0', False for static tables like 'links'.
+    """
+    return "-" in name
+
+
+def read_csv_table(csv_folder, name, columns=None):
+    """
+    Reads one table of a result folder from CSV.
+
+    Parameters
+    ----------
+    csv_folder : str
+    name : str
+        Table name, e.g. 'buses' or 'links-p0'.
+    columns : list of str, optional
+        Read only these columns (the index is always read).
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    path = os.path.join(csv_folder, f"{name}.csv")
+    usecols = None
+    if columns is not None:
+        header = pd.read_csv(path, nrows=0).columns
+        wanted = set(columns)
+        usecols = [header[0]] + [c for c in header[1:] if c in wanted]
+
+    if is_time_series(name) or name == "snapshots":
+        return pd.read_csv(path, index_col=0, parse_dates=True, usecols=usecols)
+
+    df = pd.read_csv(path, index_col=0, usecols=usecols)
+    df.index = df.index.astype(str)
+    return df
+
+
+def cache_folder(csv_folder):
+    return os.path.join(csv_folder, CACHE_FOLDER)
+
+
+def cache_is_valid(csv_folder):
+    """
+    True if the Parquet cache of ``csv_folder`` exists and matches its CSV files.
+    """
+    manifest_path = os.path.join(cache_folder(csv_folder), MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return (manifest.get("version") == CACHE_VERSION
+            and manifest.get("fingerprint") == folder_fingerprint(csv_folder))
+
+
+def _write_atomically(path, write):
+    """
+    Calls write(tmp_path) and moves the file to ``path`` when complete, so that
+    parallel readers and interrupted runs never leave a partly written file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_cache(csv_folder):
+    """
+    Converts all CSV files of a result folder to Parquet files in its cache folder.
+
+    Every table is written to a temporary file and moved into place; the
+    manifest that marks the cache as valid is written after all tables.
+    """
+    folder = cache_folder(csv_folder)
+    os.makedirs(folder, exist_ok=True)
+
+    fingerprint = folder_fingerprint(csv_folder)
+    names = table_names(csv_folder)
+    for name in names:
+        df = read_csv_table(csv_folder, name)
+        # parquet needs string column names
+        df.columns = df.columns.astype(str)
+        _write_atomically(os.path.join(folder, f"{name}.parquet"), df.to_parquet)
+
+    def write_manifest(path):
+        with open(path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "fingerprint": fingerprint, "tables": names}, f)
+
+    _write_atomically(os.path.join(folder, MANIFEST_FILE), write_manifest)
+
+    logger.info(f"Parquet-Cache erstellt unter: {folder}")
+
+
+def read_cached_table(csv_folder, name, columns=None):
+    """
+    Reads one table from the Parquet cache of a result folder.
+    """
+    path = os.path.join(cache_folder(csv_folder), f"{name}.parquet")
+    if columns is None:
+        return pd.read_parquet(path)
+
+    import pyarrow.parquet as pq
+
+    available = set(pq.read_schema(path).names)
+    return pd.read_parquet(path, columns=[c for c in columns if c in available])
+
+
+def _import_network_attributes(network, df):
+    if df is None or df.empty:
+        return
+    attrs = df.reset_index().iloc[0]
+    for attr in ["name", "srid"]:
+        if attr in attrs and pd.notnull(attrs[attr]):
+            setattr(network, attr, attrs[attr])
+
+
+def _import_snapshots(network, df):
+    # same logic as pypsa's csv importer for single-period results
+    if "snapshot" in df.columns:
+        df = df.set_index(pd.to_datetime(df["snapshot"])).drop(columns="snapshot")
+    network.set_snapshots(df.index)
+
+    cols = ["objective", "generators", "stores"]
+    if not df.columns.intersection(cols).empty:
+        network.snapshot_weightings = df.reindex(index=network.snapshots, columns=cols)
+    elif "weightings" in df.columns:
+        network.snapshot_weightings = df["weightings"].reindex(network.snapshots)
+
+
+def _align_to_snapshots(df, snapshots, name):
+    """
+    Assigns the snapshots to the rows of a time-series table by position.
+
+    PyPSA writes the time series with a positional index and assigns the
+    snapshots by position on import; aligning by label would match no row.
+    """
+    if len(df) != len(snapshots):
+        raise ValueError(
+            f"Zeitreihe {name} hat {len(df)} Zeilen, das Netzwerk {len(snapshots)} Snapshots."
+        )
+    df.index = snapshots
+    return df
+
+
+class LazySeriesDict(Dict):
+    """
+    Replacement for a component's ``*_t`` dictionary that reads each
+    time-series frame from disk on first access.
+    """
+
+    def __init__(self, pnl, network, component, tables, read_table):
+        super().__init__(pnl)
+        # object.__setattr__, Dict.__setattr__ would create dictionary items
+        object.__setattr__(self, "_network", network)
+        object.__setattr__(self, "_component", component)
+        object.__setattr__(self, "_pending", dict(tables))
+        object.__setattr__(self, "_selected", {})
+        object.__setattr__(self, "_read_table", read_table)
+        # set by compact_network: (tolerance, report) for frames loaded later
+        object.__setattr__(self, "compact", None)
+
+    def _read(self, attr, columns=None):
+        name = self._pending[attr]
+        logger.debug(f"Lade Zeitreihe {name}")
+        # full and column-selected reads: snapshots by position
+        df = _align_to_snapshots(self._read_table(name, columns), self._network.snapshots, name)
+        if self.compact is not None:
+            tolerance, report = self.compact
+            list_name = self._network.components[self._component]["list_name"]
+            label = f"{list_name}_t.{attr}"
+            df = _compact_frame(df, label, tolerance, report)
+            if label in report["kept_float64"]:
+                logger.warning(f"Toleranz überschritten, bleibt float64: {label}")
+        df.index.name = "snapshot"
+        df.columns.name = self._component
+        return df
+
+    def _load(self, attr):
+        df = self._read(attr)
+        del self._pending[attr]
+        self._selected.pop(attr, None)
+        dict.__setitem__(self, attr, df)
+
+    def load_all(self):
+        """
+        Reads all pending time series completely (drops column selections).
+        """
+        for attr in list(self._pending):
+            self._load(attr)
+
+    def select(self, columns, attrs=None):
+        """
+        Reads only ``columns`` of the pending time series. Accessing such a
+        frame afterwards returns the selected columns only; further calls add
+        columns, load_all() reads the complete frames.
+
+        Parameters
+        ----------
+        columns : list-like
+            Component names.
+        attrs : list of str, optional
+            Time-series attributes, default: all pending attributes.
+        """
+        for attr in (attrs if attrs is not None else list(self._pending)):
+            if attr not in self._pending:
+                continue
+            loaded = self._selected.get(attr, pd.Index([]))
+            missing = pd.Index(columns).difference(loaded)
+            if attr in self._selected and missing.empty:
+                continue
+
+            df = self._read(attr, missing)
+            if attr in self._selected:
+                df = pd.concat([dict.__getitem__(self, attr), df], axis=1)
+            self._selected[attr] = df.columns
+            dict.__setitem__(self, attr, df)
+
+    def __getitem__(self, attr):
+        if attr in self._pending and attr not in self._selected:
+            self._load(attr)
+        return dict.__getitem__(self, attr)
+
+    def get(self, attr, default=None):
+        if attr in self._pending and attr not in self._selected:
+            self._load(attr)
+        return dict.get(self, attr, default)
+
+    def items(self):
+        self.load_all()
+        return dict.items(self)
+
+    def values(self):
+        self.load_all()
+        return dict.values(self)
+
+    @property
+    def pending(self):
+        """
+        Attributes that have not been loaded yet.
+        """
+        return list(self._pending)
+
+
+def network_from_tables(names, read_table, lazy=False):
+    """
+    Builds a pypsa.Network from the tables of a result folder.
+
+    Parameters
+    ----------
+    names : list of str
+        Available table names (see table_names).
+    read_table : callable
+        read_table(name, columns=None) -> pd.DataFrame, e.g. from CSV or from
+        the Parquet cache.
+    lazy : bool
+        Do not read time series now, but on first access (see LazySeriesDict).
+
+    Returns
+    -------
+    pypsa.Network
+    """
+    network = pypsa.Network()
+    available = set(names)
+
+    if "network" in available:
+        _import_network_attributes(network, read_table("network"))
+    if "snapshots" in available:
+        _import_snapshots(network, read_table("snapshots"))
+
+    for component in sorted(network.all_components - {"Network", "SubNetwork"}):
+        list_name = network.components[component]["list_name"]
+        if list_name not in available:
+            continue
+
+        df = read_table(list_name)
+        standard_types = network.components[component].get("standard_types")
+        if standard_types is not None:
+            df = df.drop(df.index.intersection(standard_types.index))
+        network.import_components_from_dataframe(df, component)
+
+        series_tables = {
+            name[len(list_name) + 1:]: name
+            for name in names if name.startswith(f"{list_name}-")
+        }
+        if lazy:
+            pnl = getattr(network, f"{list_name}_t")
+            setattr(network, f"{list_name}_t",
+                    LazySeriesDict(pnl, network, component, series_tables, read_table))
+            continue
+
+        for attr, name in series_tables.items():
+            df = _align_to_snapshots(read_table(name), network.snapshots, name)
+            network.import_series_from_dataframe(df, component, attr)
+
+    return network
+
+
+def _multi_period(csv_folder):
+    path = os.path.join(csv_folder, "snapshots.csv")
+    return os.path.exists(path) and "period" in pd.read_csv(path, nrows=0).columns
+
+
+def load_network(csv_folder=None, cache=False, lazy=False):
+    """
+    Loads an eTraGo result folder as pypsa.Network.
+
+    Parameters
+    ----------
+    csv_folder : str, optional
+        PyPSA csv folder. Without it an empty network is returned.
+    cache : bool
+        Read the folder through the Parquet cache (built on first use and
+        rebuilt when the CSV files change).
+    lazy : bool
+        Load static tables now and every time series on first access.
+
+    Returns
+    -------
+    pypsa.Network
+    """
+    if csv_folder is None or not (cache or lazy):
+        return pypsa.Network(csv_folder)
+
+    if _multi_period(csv_folder):
+        logger.warning("Parquet-Cache und Lazy-Loading unterstützen keine Multi-Period-Ergebnisse, lade CSV.")
+        return pypsa.Network(csv_folder)
+
+    read_table = lambda name, columns=None: read_csv_table(csv_folder, name, columns)
+    if cache:
+        try:
+            if not cache_is_valid(csv_folder):
+                build_cache(csv_folder)
+            read_table = lambda name, columns=None: read_cached_table(csv_folder, name, columns)
+        except ImportError as e:
+            logger.warning(f"Parquet-Cache nicht verfügbar ({e}), lade CSV.")
+            if not lazy:
+                return pypsa.Network(csv_folder)
+
+    return network_from_tables(table_names(csv_folder), read_table, lazy=lazy)
+
+
+def select_time_series(network, selection, attrs=None):
+    """
+    Restricts the pending time series of a lazily loaded network to a
+    component selection, so that only these columns are read from disk.
+
+    Parameters
+    ----------
+    network : pypsa.Network
+        Network loaded with lazy=True. For eagerly loaded networks nothing happens.
+    selection : dict
+        Component list name -> component names, e.g. {"links": [...], "generators": [...]}.
+    attrs : dict, optional
+        Component list name -> time-series attributes to restrict, default: all.
+    """
+    attrs = attrs or {}
+    for list_name, columns in selection.items():
+        pnl = getattr(network, f"{list_name}_t")
+        if not isinstance(pnl, LazySeriesDict):
+            logger.debug(f"{list_name}_t ist bereits geladen, keine Spaltenauswahl möglich.")
+            continue
+        pnl.select(columns, attrs.get(list_name))
+
+
+def _relative_error(reference, values):
+    """
+    Largest deviation of the column sums of ``values`` from ``reference``,
+    relative to the sum of absolute values of each column.
+    """
+    scale = reference.abs().sum(axis=0)
+    deviation = pd.Series(
+        values.to_numpy(dtype=np.float64).sum(axis=0), index=values.columns
+    ).sub(reference.sum(axis=0)).abs()
+    relative = deviation[scale > 0] / scale[scale > 0]
+    return float(relative.max()) if len(relative) else 0.0
+
+
+def _compact_frame(df, label, tolerance, report):
+    """
+    Returns ``df`` as float32 if the column sums stay within ``tolerance``
+    of float64, otherwise unchanged; updates ``report`` (see compact_network).
+    """
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    report["bytes_before"] += bytes_before
+    if df.empty or not (df.dtypes == np.float64).all():
+        report["bytes_after"] += bytes_before
+    else:
+        compact = df.astype(np.float32)
+        error = _relative_error(df, compact)
+        if error > tolerance:
+            report["kept_float64"].append(label)
+            report["bytes_after"] += bytes_before
+        else:
+            report["max_rel_error"] = max(report["max_rel_error"], error)
+            report["bytes_after"] += int(compact.memory_usage(deep=True).sum())
+            df = compact
+
+    report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+    return df
+
+
+def compact_network(network, tolerance=1e-4):
+    """
+    Converts a loaded network to a compact representation: time series as
+    float32 and the key columns carrier/bus/bus0/bus1 as categoricals.
+
+    For every time series the column sums are compared with float64; a frame
+    whose relative deviation exceeds ``tolerance`` stays float64. Time series
+    of a lazily loaded network are checked and converted when they are read;
+    the returned report is updated in place by these reads.
+
+    The compact network is meant for evaluation; PyPSA operations that expect
+    string columns (e.g. optimisation) may not work on it.
+
+    Parameters
+    ----------
+    network : pypsa.Network
+    tolerance : float
+        Maximum relative deviation of aggregated results from float64.
+
+    Returns
+    -------
+    dict
+        'bytes_before', 'bytes_after', 'bytes_saved', 'max_rel_error' and
+        'kept_float64' (frames that exceed the tolerance).
+    """
+    report = {"bytes_before": 0, "bytes_after": 0, "bytes_saved": 0, "max_rel_error": 0.0, "kept_float64": []}
+
+    for component in sorted(network.all_components - {"Network", "SubNetwork"}):
+        list_name = network.components[component]["list_name"]
+        static = getattr(network, list_name)
+        report["bytes_before"] += int(static.memory_usage(deep=True).sum())
+        for col in KEY_COLUMNS:
+            if col in static.columns and static[col].dtype == object:
+                static[col] = static[col].astype("category")
+        report["bytes_after"] += int(static.memory_usage(deep=True).sum())
+
+        pnl = getattr(network, f"{list_name}_t")
+        if isinstance(pnl, LazySeriesDict):
+            # frames read later are checked and reported in LazySeriesDict._read
+            object.__setattr__(pnl, "compact", (tolerance, report))
+            loaded = [attr for attr in dict.keys(pnl) if attr not in pnl.pending]
+        else:
+            loaded = list(pnl.keys())
+
+        for attr in loaded:
+            df = dict.__getitem__(pnl, attr)
+            dict.__setitem__(pnl, attr, _compact_frame(df, f"{list_name}_t.{attr}", tolerance, report))
+
+    report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+    logger.info(
+        f"Kompaktmodus: {report['bytes_before'] / 1e6:.1f} MB -> {report['bytes_after'] / 1e6:.1f} MB "
+        f"(max. relative Abweichung {report['max_rel_error']:.2e}, Toleranz {tolerance:.0e})"
+    )
+    if report["kept_float64"]:
+        logger.warning(f"Toleranz überschritten, bleiben float64: {report['kept_float64']}")
+
+    return report
@@ -1,15 +1,28 @@
 import logging
 import pypsa
 
+from network_loader import (
+    load_network,
+    select_time_series,
+    compact_network,
+    cache_is_valid,
+    read_cached_table
+)
+from network_access import time_series
+from timeseries_store import open_store
+
 from plot_comps import (
     create_bus_map,
     create_links_map,
     create_lines_map,
     create_buses_and_links_map,
     create_buses_links_lines_map,
+    create_combined_map,
     create_maps,
     find_interest_buses,
-    find_links_connected_to_interest_buses
+    find_bus_regions,
+    find_links_connected_to_interest_buses,
+    interest_area_selection
 )
 from calc_results import (
     capacities_opt,
@@ -23,6 +36,8 @@ from plot_base_results import (
     plot_decentral_heat_generation_bar,
     plot_central_heat_dispatch
 )
+from interest_results import interest_area_results, generation_breakdown
+from energy_index import CumulativeEnergyIndex
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +46,88 @@ class Etrago1:
     def __init__(self, args, csv_folder=None):
         self.args = args
         self.name = args["name"] # To DO compose of args -> {interest_area}_{#AC_Buses}_{#CH_4_Buses}
-
-        # PyPSA-Netzwerk laden
-        self.network = pypsa.Network(csv_folder)
+        self.csv_folder = csv_folder
+
+        # PyPSA-Netzwerk laden (Optionen siehe network_loader.py)
+        load_settings = args.get("load_settings", {})
+        self.network = load_network(
+            csv_folder,
+            cache=load_settings.get("cache", False),
+            lazy=load_settings.get("lazy", False)
+        )
+
+        # Kompaktmodus: float32-Zeitreihen und kategorische carrier/bus-Spalten
+        self.compact_report = None
+        if load_settings.get("compact", False):
+            self.compact_report = compact_network(
+                self.network, tolerance=load_settings.get("compact_tolerance", 1e-4)
+            )
+
+        # Memory-mapped Zeitreihen (siehe timeseries_store.py)
+        self.timeseries_store = None
+        if load_settings.get("memmap", False) and csv_folder is not None:
+            # aus dem Parquet-Cache lesen, falls aktiv (sonst CSV)
+            read_table = None
+            if load_settings.get("cache", False) and cache_is_valid(csv_folder):
+                read_table = lambda name: read_cached_table(csv_folder, name)
+            self.timeseries_store = open_store(csv_folder, self.network.snapshots, read_table=read_table)
+
+        # Caches für find_interest_buses, find_bus_regions (siehe plot_comps)
+        # und interest_area_results (siehe interest_results.py)
+        self._interest_buses_cache = {}
+        self._bus_regions_cache = {}
+        self._interest_results_cache = {}
+        self._energy_index_cache = {}
+
+    def invalidate_interest_cache(self):
+        """
+        Leert die Caches der Busse im Interessengebiet, der Bus-Regionen-Zuordnung
+        und der Ergebnisse des Interessengebiets, z.B. nach Änderungen an
+        args["interest_area"], an der NUTS-3 GeoJSON oder am Netzwerk selbst.
+        """
+        self._interest_buses_cache.clear()
+        self._bus_regions_cache.clear()
+        self._interest_results_cache.clear()
+        self._energy_index_cache.clear()
+
+    def time_series(self, list_name, attr, columns=None):
+        """
+        Liefert eine Zeitreihe (z.B. links_t.p1) oder eine Spaltenauswahl davon,
+        aus dem Memory-mapped Store falls aktiviert (args["load_settings"]["memmap"]),
+        sonst aus dem PyPSA-Netzwerk.
+        """
+        if self.timeseries_store is not None and (list_name, attr) in self.timeseries_store:
+            return self.timeseries_store.frame(list_name, attr, columns)
+        return time_series(self.network, list_name, attr, columns)
+
+    def energy_index(self, list_name, attr, columns=None):
+        """
+        Liefert einen CumulativeEnergyIndex (siehe energy_index.py) einer Zeitreihe
+        bzw. einer Spaltenauswahl; wird pro Zeitreihe und Auswahl nur einmal berechnet.
+        """
+        key = (list_name, attr, None if columns is None else tuple(columns))
+        if key not in self._energy_index_cache:
+            self._energy_index_cache[key] = CumulativeEnergyIndex(
+                self.time_series(list_name, attr, columns)
+            )
+        return self._energy_index_cache[key]
+
+    def load_time_series(self, selection="interest_area", attrs=None):
+        """
+        Liest bei Lazy-Loading (args["load_settings"]["lazy"]) nur die Spalten
+        der ausgewählten Komponenten aus den Zeitreihen-Dateien.
+
+        Parameters
+        ----------
+        selection : str or dict
+            "interest_area" für alle an das Interessengebiet angeschlossenen
+            Komponenten oder ein Dictionary Komponentenliste -> Komponentennamen.
+        attrs : dict, optional
+            Komponentenliste -> Zeitreihen-Attribute (z.B. {"links": ["p0", "p1"]}).
+        """
+        if selection == "interest_area":
+            selection = interest_area_selection(self)
+        select_time_series(self.network, selection, attrs)
 
     # Add functions
     create_bus_map = create_bus_map
@@ -46,10 +140,14 @@ class Etrago1:
 
     create_buses_links_lines_map = create_buses_links_lines_map
 
+    create_combined_map = create_combined_map
+
     create_maps = create_maps
 
     find_interest_buses = find_interest_buses
 
+    find_bus_regions = find_bus_regions
+
     find_links_connected_to_interest_buses = find_links_connected_to_interest_buses
 
     capacities_opt = capacities_opt
@@ -64,4 +162,8 @@ class Etrago1:
 
     plot_decentral_heat_generation_bar = plot_decentral_heat_generation_bar
 
-    plot_central_heat_dispatch = plot_central_heat_dispatch
\ No newline at end of file
+    plot_central_heat_dispatch = plot_central_heat_dispatch
+
+    interest_area_results = interest_area_results
+
+    generation_breakdown = generation_breakdown
\ No newline at end of file
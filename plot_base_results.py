@@ -13,12 +13,8 @@ from shapely.affinity import translate
 import pypsa
 plt.style.use('bmh')
 
-from calc_base_results import (
-    capacities_opt_ing,
-    df_electricity_generation,
-    df_central_heat_generation,
-    df_decentral_heat_generation
-)
+from interest_results import interest_area_results
+from downsample import downsample_frame
 
 def plot_capacity_bar(
     etrago,
@@ -42,8 +38,17 @@ def plot_capacity_bar(
         Zielordner für den Plot.
     """
     # 1️⃣ DataFrame mit den Kapazitäten erzeugen
-    df_caps = capacities_opt_ing(etrago)
+    df_caps = interest_area_results(etrago).capacities.copy()
 
+    render_capacity_bar(df_caps, title, os.path.join(output_folder, filename))
+
+
+def render_capacity_bar(df_caps, title, filepath):
+    """
+    Zeichnet das Kapazitäten-Balkendiagramm (siehe plot_capacity_bar) und
+    speichert es unter filepath. Benötigt kein etrago-Objekt, kann daher auch
+    in einem Worker-Prozess laufen (siehe render_pool.py).
+    """
     # 2️⃣ Daten für den Plot vorbereiten (Reihenfolge bleibt erhalten)
     carriers = df_caps["carrier"]
     capacities = df_caps["Capacity"]
@@ -66,12 +71,9 @@ def plot_capacity_bar(
     plt.tight_layout()
 
     # 6️⃣ Ordner anlegen, falls nicht vorhanden
-    os.makedirs(output_folder, exist_ok=True)
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
 
-    # 7️⃣ Vollständiger Pfad
-    filepath = os.path.join(output_folder, filename)
-
-    # 8️⃣ Plot speichern
+    # 7️⃣ Plot speichern
     plt.savefig(filepath, dpi=300)
     plt.close()
 
@@ -84,30 +86,23 @@ import os
 import matplotlib.pyplot as plt
 import os
 
-def plot_electricity_generation_bar(
-    etrago,
-    title="Electricity Generation by Carrier",
-    filename="electricity_generation_bar.png",
-    output_folder="Base_results"
-):
+def render_generation_bar(df_generation, value_column, title, filepath, color, xlabel):
     """
-    Plots electricity generation and import as horizontal bar chart.
+    Draws a generation table (columns 'carrier', value_column in MWh) as
+    horizontal bar chart in GWh with percentages and saves it to filepath.
+    Shared by the electricity, central heat and decentral heat bar plots.
     """
-
     # Create output folder if it does not exist
-    os.makedirs(output_folder, exist_ok=True)
-
-    # Get data
-    df_generation = df_electricity_generation(etrago)
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
 
     # Convert to GWh
-    df_generation["generation"] = df_generation["generation"] / 1e3
+    df_generation = df_generation.assign(**{value_column: df_generation[value_column] / 1e3})
 
-    # Sort descending
-    df_sorted = df_generation.sort_values(by="generation", ascending=True)
+    # Sort ascending for horizontal bar plot
+    df_sorted = df_generation.sort_values(by=value_column, ascending=True)
 
     # Compute total for percentages
-    total_generation = df_sorted["generation"].sum()
+    total_generation = df_sorted[value_column].sum()
 
     # Initialize figure
     fig, ax = plt.subplots(figsize=(8, 5))
@@ -115,17 +110,17 @@ def plot_electricity_generation_bar(
     # Plot horizontal bars
     bars = ax.barh(
         df_sorted["carrier"],
-        df_sorted["generation"],
-        color="steelblue"
+        df_sorted[value_column],
+        color=color
     )
 
     # Labels
-    ax.set_xlabel("Stromerzeugung [GWh]")
+    ax.set_xlabel(xlabel)
     ax.set_ylabel("Technologie")
     ax.set_title(title)
 
     # Annotate bars with value and percentage
-    for bar, value in zip(bars, df_sorted["generation"]):
+    for bar, value in zip(bars, df_sorted[value_column]):
         percent = (value / total_generation) * 100
         ax.text(
             value + 0.5,
@@ -138,71 +133,73 @@ def plot_electricity_generation_bar(
     plt.tight_layout()
 
     # Save plot
-    save_path = os.path.join(output_folder, filename)
-    plt.savefig(save_path, dpi=300)
+    plt.savefig(filepath, dpi=300)
     plt.close()
 
-    print(f"Plot successfully saved to: {save_path}")
+    print(f"Plot successfully saved to: {filepath}")
 
 
-def plot_central_heat_generation_bar(
-    etrago,
-    title="Zentrale Wärmerversorgung je Technologie",
-    filename="central_heat_generation_bar.png",
-    output_folder="Base_results"
-):
+def render_generation_breakdown(df_breakdown, bus_carrier, title, filepath, ylabel):
     """
-    Plots central heat generation as horizontal bar chart.
+    Draws the generation per period of one bus carrier (see
+    interest_results.generation_breakdown, values in MWh) as stacked bar
+    chart in GWh and saves it to filepath.
     """
-
     # Create output folder if it does not exist
-    os.makedirs(output_folder, exist_ok=True)
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
 
-    # Get data
-    df_generation = df_central_heat_generation(etrago)
+    # periods x carriers in GWh
+    df = df_breakdown[df_breakdown["bus_carrier"] == bus_carrier]
+    df = df.pivot_table(index="period", columns="carrier", values="generation", aggfunc="sum", observed=True) / 1e3
+    df.index = df.index.astype(str)
 
-    # Convert to GWh_th
-    df_generation["generation_cH"] = df_generation["generation_cH"] / 1e3
+    fig, ax = plt.subplots(figsize=(10, 6))
+    df.plot(kind="bar", stacked=True, ax=ax, width=0.8)
 
-    # Sort ascending for horizontal bar plot
-    df_sorted = df_generation.sort_values(by="generation_cH", ascending=True)
-
-    # Compute total for percentages
-    total_generation = df_sorted["generation_cH"].sum()
+    ax.set_xlabel("Zeitraum")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.legend(title="Technologie", bbox_to_anchor=(1.02, 1), loc="upper left", fontsize=8)
 
-    # Initialize figure
-    fig, ax = plt.subplots(figsize=(8, 5))
+    plt.tight_layout()
 
-    # Plot horizontal bars
-    bars = ax.barh(
-        df_sorted["carrier"],
-        df_sorted["generation_cH"],
-        color="indianred"
-    )
+    # Save plot
+    plt.savefig(filepath, dpi=300)
+    plt.close(fig)
 
-    ax.set_xlabel("Heat Generation [GWh_th]")
-    ax.set_ylabel("Technologie")
-    ax.set_title(title)
+    print(f"Plot successfully saved to: {filepath}")
 
-    # Annotate bars with value and percentage
-    for bar, value in zip(bars, df_sorted["generation_cH"]):
-        percent = (value / total_generation) * 100
-        ax.text(
-            value + 0.5,
-            bar.get_y() + bar.get_height() / 2,
-            f"{value:.1f} ({percent:.1f}%)",
-            va="center",
-            fontsize=9
-        )
 
-    plt.tight_layout()
+def plot_electricity_generation_bar(
+    etrago,
+    title="Electricity Generation by Carrier",
+    filename="electricity_generation_bar.png",
+    output_folder="Base_results"
+):
+    """
+    Plots electricity generation and import as horizontal bar chart.
+    """
+    render_generation_bar(
+        interest_area_results(etrago).electricity, "generation", title,
+        os.path.join(output_folder, filename),
+        color="steelblue", xlabel="Stromerzeugung [GWh]"
+    )
 
-    # Save figure
-    save_path = os.path.join(output_folder, filename)
-    plt.savefig(save_path, dpi=300)
-    plt.close()
 
-    print(f"Plot successfully saved to: {save_path}")
+def plot_central_heat_generation_bar(
+    etrago,
+    title="Zentrale Wärmerversorgung je Technologie",
+    filename="central_heat_generation_bar.png",
+    output_folder="Base_results"
+):
+    """
+    Plots central heat generation as horizontal bar chart.
+    """
+    render_generation_bar(
+        interest_area_results(etrago).central_heat, "generation_cH", title,
+        os.path.join(output_folder, filename),
+        color="indianred", xlabel="Heat Generation [GWh_th]"
+    )
 
 
 def plot_decentral_heat_generation_bar(
@@ -214,55 +211,15 @@ def plot_decentral_heat_generation_bar(
     """
     Plots decentral heat generation as horizontal bar chart.
     """
-
-    # Create output folder if it does not exist
-    os.makedirs(output_folder, exist_ok=True)
-
-    # Get data
-    df_generation = df_decentral_heat_generation(etrago)
-
-    # Convert to GWh_th
-    df_generation["generation_dH"] = df_generation["generation_dH"] / 1e3
-
-    # Sort ascending for horizontal bar plot
-    df_sorted = df_generation.sort_values(by="generation_dH", ascending=True)
-
-    # Compute total for percentages
-    total_generation = df_sorted["generation_dH"].sum()
-
-    # Initialize figure
-    fig, ax = plt.subplots(figsize=(8, 5))
-
-    # Plot horizontal bars
-    bars = ax.barh(
-        df_sorted["carrier"],
-        df_sorted["generation_dH"],
-        color="darkorange"
+    render_generation_bar(
+        interest_area_results(etrago).decentral_heat, "generation_dH", title,
+        os.path.join(output_folder, filename),
+        color="darkorange", xlabel="Heat Generation [GWh_th]"
     )
 
-    ax.set_xlabel("Heat Generation [GWh_th]")
-    ax.set_ylabel("Technologie")
-    ax.set_title(title)
 
-    # Annotate bars with value and percentage
-    for bar, value in zip(bars, df_sorted["generation_dH"]):
-        percent = (value / total_generation) * 100
-        ax.text(
-            value + 0.5,
-            bar.get_y() + bar.get_height() / 2,
-            f"{value:.1f} ({percent:.1f}%)",
-            va="center",
-            fontsize=9
-        )
-
-    plt.tight_layout()
-
-    # Save figure
-    save_path = os.path.join(output_folder, filename)
-    plt.savefig(save_path, dpi=300)
-    plt.close()
-
-    print(f"Plot successfully saved to: {save_path}")
+DISPATCH_FIGSIZE = (14, 7)
+DISPATCH_DPI = 300
 
 
 def plot_central_heat_dispatch(
@@ -270,43 +227,81 @@ def plot_central_heat_dispatch(
     time=None,
     title="Dispatch Central Heat und Wärmeerzeuger",
     filename="central_heat_dispatch.png",
-    output_folder="Base_results"
+    output_folder="Base_results",
+    downsample=True,
+    max_points=None,
+    downsample_method="minmax"
 ):
     """
     Plots central heat dispatch by carrier in the interest area as stacked area plot
     and overlays the central heat load. Includes charging of heat storage units.
 
+    Long horizons are downsampled before plotting to about the figure's width
+    in pixels (see downsample.py); peaks of the stacked total and of the load
+    are kept.
+
     Args:
         etrago: Etrago instance with loaded PyPSA network
         time (str or slice, optional): Time slice for plotting (e.g. '2015-07') or slice("2011-05-01", "2011-05-31")
         title (str, optional): Title of the plot
         filename (str, optional): Filename for saving the plot (will be extended by time tag)
         output_folder (str, optional): Output folder for saving the file
+        downsample (bool, optional): Reduce the plotted snapshots on long horizons (default True)
+        max_points (int, optional): Snapshots to keep, default: figure width in pixels
+        downsample_method (str, optional): 'minmax' (envelope) or 'lttb'
     """
-    # get buses of interest area
-    buses_interest = etrago.find_interest_buses()
-    bus_list = buses_interest.index.to_list()
+    carrier_grouped, central_heat_ts = central_heat_dispatch_data(
+        etrago, time, downsample=downsample, max_points=max_points,
+        downsample_method=downsample_method
+    )
+    render_central_heat_dispatch(
+        carrier_grouped, central_heat_ts, title,
+        os.path.join(output_folder, time_tagged_filename(filename, time))
+    )
 
-    # get load time series of interest area
-    loads_interest = etrago.network.loads[etrago.network.loads.bus.isin(bus_list)]
-    loads_int_ts = etrago.network.loads_t.p_set.loc[:, loads_interest.index]
 
-    # get bus id of central heat buses
-    cH_index = buses_interest[buses_interest.carrier == "central_heat"].index
+def time_tagged_filename(filename, time):
+    """
+    Extends a filename by the time selection, e.g. 'dispatch_2011-07.png'.
+    """
+    if time is None:
+        return filename
+    if isinstance(time, slice):
+        start = str(time.start)[:10] if time.start else "start"
+        end = str(time.stop)[:10] if time.stop else "end"
+        time_tag = f"{start}_to_{end}"
+    else:
+        time_tag = str(time).replace(" ", "_")
+    return filename.replace(".png", f"_{time_tag}.png")
+
+
+def central_heat_dispatch_data(
+    etrago,
+    time=None,
+    downsample=True,
+    max_points=None,
+    downsample_method="minmax"
+):
+    """
+    Returns the plot data of plot_central_heat_dispatch.
+
+    Returns:
+        tuple(pd.DataFrame, pd.Series): dispatch per carrier (snapshots x carrier)
+        and central heat load, downsampled if requested.
+    """
+    # selection of the interest area (buses, loads, links on/from central heat)
+    results = interest_area_results(etrago)
 
-    # get links connected to interest buses
-    connected_links = etrago.find_links_connected_to_interest_buses()
+    # get load time series of interest area
+    loads_int_ts = etrago.time_series("loads", "p_set", results.loads.index)
 
     # links that dispatch into central_heat network
-    links_on_cH = connected_links[
-        ((connected_links.bus1.isin(cH_index)) & (connected_links.p_nom_extendable == True)) |
-        (connected_links.carrier == "central_waste_CHP_heat")
-    ]
-    links_on_cH_ts = etrago.network.links_t.p1[links_on_cH.index] * (-1)
+    links_on_cH = results.links_on_cH
+    links_on_cH_ts = etrago.time_series("links", "p1", links_on_cH.index) * (-1)
 
     # links that charge from central_heat network (e.g. storage)
-    links_from_cH = connected_links[(connected_links.bus0.isin(cH_index))]
-    links_from_cH_ts = etrago.network.links_t.p0[links_from_cH.index] * (-1)
+    links_from_cH = results.links_from_cH
+    links_from_cH_ts = etrago.time_series("links", "p0", links_from_cH.index) * (-1)
 
     # apply time filter if given
     if time is not None:
@@ -314,13 +309,10 @@ def plot_central_heat_dispatch(
         links_on_cH_ts = links_on_cH_ts.loc[time]
         links_from_cH_ts = links_from_cH_ts.loc[time]
 
-    # map carrier names
-    carriers_on_cH = pd.Series(links_on_cH["carrier"].to_dict())
-    carriers_from_cH = pd.Series(links_from_cH["carrier"].to_dict())
-
-    # group dispatch and storage charging by carrier
-    grouped_on_cH = links_on_cH_ts.T.groupby(carriers_on_cH).sum().T
-    grouped_from_cH = links_from_cH_ts.T.groupby(carriers_from_cH).sum().T
+    # group dispatch and storage charging by carrier (sparse link -> carrier matrix,
+    # built once per interest-area selection)
+    grouped_on_cH = results.aggregators["links_on_cH"].time_series(links_on_cH_ts)
+    grouped_from_cH = results.aggregators["links_from_cH"].time_series(links_from_cH_ts)
 
     # combine both sources
     carrier_grouped = pd.concat([grouped_on_cH, grouped_from_cH], axis=1)
@@ -337,18 +329,24 @@ def plot_central_heat_dispatch(
     central_heat_ts = loads_int_ts[column_to_plot]
     central_heat_ts = central_heat_ts.reindex(carrier_grouped.index).fillna(0)
 
-    # extend filename with time info
-    if time is not None:
-        if isinstance(time, slice):
-            start = str(time.start)[:10] if time.start else "start"
-            end = str(time.stop)[:10] if time.stop else "end"
-            time_tag = f"{start}_to_{end}"
-        else:
-            time_tag = str(time).replace(" ", "_")
-        filename = filename.replace(".png", f"_{time_tag}.png")
+    # reduce to about one snapshot per pixel column, keeping the peaks
+    if downsample:
+        if max_points is None:
+            max_points = int(DISPATCH_FIGSIZE[0] * DISPATCH_DPI)
+        carrier_grouped, (central_heat_ts,) = downsample_frame(
+            carrier_grouped, max_points, method=downsample_method, extra=[central_heat_ts]
+        )
+
+    return carrier_grouped, central_heat_ts
 
+
+def render_central_heat_dispatch(carrier_grouped, central_heat_ts, title, filepath):
+    """
+    Draws the dispatch area plot with the load line (see plot_central_heat_dispatch)
+    and saves it to filepath.
+    """
     # plot setup
-    fig, ax = plt.subplots(figsize=(14, 7))
+    fig, ax = plt.subplots(figsize=DISPATCH_FIGSIZE)
     carrier_grouped.plot.area(ax=ax, linewidth=0, alpha=0.6)
     central_heat_ts.plot(ax=ax, color="black", linewidth=2, label="Central Heat Load")
 
@@ -360,12 +358,8 @@ def plot_central_heat_dispatch(
     plt.tight_layout()
 
     # save plot
-    os.makedirs(output_folder, exist_ok=True)
-    filepath = os.path.join(output_folder, filename)
-    plt.savefig(filepath, dpi=300)
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    plt.savefig(filepath, dpi=DISPATCH_DPI)
     plt.close()
 
     print(f"Plot erfolgreich gespeichert unter: {filepath}")
-
-
-
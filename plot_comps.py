@@ -1,7 +1,10 @@
 import os
+import logging
+import weakref
 import geopandas as gpd
 from shapely.geometry import Point
 import folium
+from folium.plugins import MarkerCluster
 import pandas as pd
 import matplotlib.cm as cm
 import matplotlib.colors as mcolors
@@ -9,36 +12,194 @@ import matplotlib.pyplot as plt
 import io
 from base64 import b64encode
 import numpy as np
-from shapely.affinity import translate
+import shapely
+
+from network_access import static_table, components_at_buses
+from geometry_cache import load_nuts, interest_regions, map_layer, regions_in_bounds, to_topojson
+from bus_regions import load_or_assign_bus_regions, buses_in_regions
+
+logger = logging.getLogger(__name__)
+
+# plot_settings["nuts_layer"]: embedded NUTS-3 background layer (see geometry_cache.map_layer)
+NUTS_LAYER_DEFAULTS = {
+    "zoom": 9,          # simplify to the resolution of this zoom level, None: full precision
+    "precision": 4,     # decimal places of the coordinates, None: all
+    "topojson": False,  # encode as TopoJSON with shared borders (requires `topojson`)
+    "clip_margin": 0.5, # with plot_comps_of_interest: only regions within the bus extent + margin [°], None: all
+}
+
+# plot_settings["large_network"]: rendering of large (e.g. unclustered) networks
+LARGE_NETWORK_DEFAULTS = {
+    "mode": "auto",             # "auto": switch by component counts, "on": always, "off": never
+    "canvas_threshold": 2000,   # Canvas instead of SVG from this many buses + links + lines
+    "cluster_threshold": 5000,  # cluster buses per carrier from this many buses
+    "lod_zoom": 10,             # level of detail: clusters dissolve into single buses from this zoom
+}
+
+def prepare_map_data(etrago):
+    """
+    Bereitet die gemeinsamen Daten aller Karten einmal vor: NUTS-3-Regionen,
+    Busse (GeoDataFrame im CRS der NUTS-3-Karte), Links, Lines und die
+    Farbskala der Lines.
+
+    Mit plot_settings["plot_comps_of_interest"] enthält die Auswahl die Busse
+    im Interessengebiet, die daran angeschlossenen Links und Lines sowie
+    deren Endbusse; der Jitter für übereinanderliegende Busse wird einmal für
+    alle Karten berechnet, sodass ein Bus in jeder Karte an derselben Stelle liegt.
 
-def create_bus_map(etrago):
+    Die NUTS-3-Hintergrundebene wird nach plot_settings["nuts_layer"]
+    vereinfacht (siehe NUTS_LAYER_DEFAULTS); mit plot_comps_of_interest enthält
+    sie nur die Regionen im Umkreis (clip_margin) der gezeichneten Busse.
 
+    Die Darstellung großer Netze (Canvas, Cluster) wird nach
+    plot_settings["large_network"] gewählt (siehe large_network_rendering).
+
+    Returns
+    -------
+    dict
+        'nuts', 'nuts_layer', 'nuts_topology' (TopoJSON oder None), 'buses',
+        'interest_buses' (Index der Busse im Interessengebiet oder None),
+        'links', 'lines', 'line_norm', 'line_cmap', 'rendering'.
+    """
     network = etrago.network
     args = etrago.args
 
-    bussize = args.get("plot_settings", {}).get("bussize", 6)
-
     # === load NUTS-3 Shapefile ===
-    nuts_3_map = args["nuts_3_map"]
-    nuts = gpd.read_file(nuts_3_map)
+    nuts = load_nuts(args["nuts_3_map"])
 
     # === collect buses from network ===
-    df = network.buses.copy()
-    df["name"] = df.index
-
-    # create GeoDataFrame for buses
-    gdf_buses = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df['x'], df['y']), crs="EPSG:4326")
-    # transform gdf_buses into CRS of the NUTS-3 map
-    gdf_buses = gdf_buses.to_crs(nuts.crs)
+    all_buses = static_table(network, "buses")
+    all_buses["name"] = all_buses.index
 
-    # === select buses of interest area ===
     if args["plot_settings"]["plot_comps_of_interest"]:
-        gdf_buses = find_interest_buses(etrago)
+        # Determine interest area buses directly
+        gdf_buses_interest = find_interest_buses(etrago)
+
+        # Links & Lines with at least one bus in the interest area
+        links = find_links_connected_to_interest_buses(etrago)
+        lines = components_at_buses(network, "lines", gdf_buses_interest.index)
+
+        # ALL buses that appear in links and lines (for coordinates/lookup)
+        buses_used = set(links['bus0']) | set(links['bus1']) | set(lines['bus0']) | set(lines['bus1'])
+        buses_for_lookup = all_buses.loc[all_buses.index.isin(buses_used)]
+
+        gdf_buses_lookup = gpd.GeoDataFrame(
+            buses_for_lookup,
+            geometry=gpd.points_from_xy(buses_for_lookup['x'], buses_for_lookup['y']),
+            crs="EPSG:4326"
+        ).to_crs(nuts.crs)
+
+        # Combine interest buses and lookup buses
+        gdf_buses = pd.concat([gdf_buses_interest, gdf_buses_lookup])
+        gdf_buses = gdf_buses[~gdf_buses.index.duplicated(keep='first')]
+
         # Move duplicates to avoid overlapping
         gdf_buses = apply_jitter_to_duplicate_buses(gdf_buses, epsg_m=3857, jitter_radius=500)
+        interest_buses = gdf_buses_interest.index
+    else:
+        # === full network ===
+        links = static_table(network, "links")
+        lines = static_table(network, "lines")
+        gdf_buses = gpd.GeoDataFrame(
+            all_buses,
+            geometry=gpd.points_from_xy(all_buses['x'], all_buses['y']),
+            crs="EPSG:4326"
+        ).to_crs(nuts.crs)
+        interest_buses = None
+
+    # === color normalization s_max_pu (based on the full network) ===
+    line_norm = mcolors.Normalize(vmin=network.lines['s_max_pu'].min(),
+                                  vmax=network.lines['s_max_pu'].max())
+
+    # === simplified NUTS-3 background layer ===
+    layer_settings = {**NUTS_LAYER_DEFAULTS, **args["plot_settings"].get("nuts_layer", {})}
+    nuts_layer = map_layer(
+        args["nuts_3_map"], zoom=layer_settings["zoom"], precision=layer_settings["precision"]
+    )
+    if interest_buses is not None and layer_settings["clip_margin"] is not None and not gdf_buses.empty:
+        # only regions around the plotted buses (spatial index query on the bounding box)
+        bounds = gdf_buses.to_crs(nuts_layer.crs).total_bounds
+        nuts_layer = regions_in_bounds(nuts_layer, bounds, margin=layer_settings["clip_margin"])
+    nuts_topology = None
+    if layer_settings["topojson"]:
+        try:
+            nuts_topology = to_topojson(nuts_layer)
+        except ImportError as e:
+            logger.warning(f"TopoJSON nicht verfügbar ({e}), NUTS-3-Ebene wird als GeoJSON eingebettet.")
+
+    return {
+        "nuts": nuts,
+        "nuts_layer": nuts_layer,
+        "nuts_topology": nuts_topology,
+        "buses": gdf_buses,
+        "interest_buses": interest_buses,
+        "links": links,
+        "lines": lines,
+        "line_norm": line_norm,
+        "line_cmap": cm.get_cmap('viridis'),
+        "rendering": large_network_rendering(
+            len(gdf_buses), len(links) + len(lines), args["plot_settings"].get("large_network", {})
+        ),
+    }
+
+def large_network_rendering(n_buses, n_branches, settings=None):
+    """
+    Wählt die Darstellung abhängig von der Größe des Netzes.
+
+    Parameters
+    ----------
+    n_buses : int
+        Anzahl der gezeichneten Busse.
+    n_branches : int
+        Anzahl der gezeichneten Links und Lines.
+    settings : dict, optional
+        plot_settings["large_network"], ergänzt um LARGE_NETWORK_DEFAULTS.
+
+    Returns
+    -------
+    dict
+        'prefer_canvas' (Canvas- statt SVG-Rendering), 'cluster' (Busse je
+        Carrier clustern) und 'lod_zoom' (ab diesem Zoom keine Cluster).
+    """
+    settings = {**LARGE_NETWORK_DEFAULTS, **(settings or {})}
+    mode = settings["mode"]
+    if mode not in ("auto", "on", "off"):
+        raise ValueError(f"Unbekannter large_network mode '{mode}', erlaubt: ('auto', 'on', 'off')")
+
+    if mode == "auto":
+        prefer_canvas = n_buses + n_branches >= settings["canvas_threshold"]
+        cluster = n_buses >= settings["cluster_threshold"]
+    else:
+        prefer_canvas = cluster = mode == "on"
+
+    if prefer_canvas or cluster:
+        logger.info(
+            f"Großes Netz ({n_buses} Busse, {n_branches} Links/Lines): "
+            f"Canvas={prefer_canvas}, Cluster={cluster}"
+        )
+    return {"prefer_canvas": prefer_canvas, "cluster": cluster, "lod_zoom": settings["lod_zoom"]}
 
+def _shown_buses(map_data, components=()):
+    """
+    Busse, die in einer Karte gezeichnet werden: im Interessengebiet plus die
+    Endbusse der gegebenen Komponenten (bzw. alle Busse des Netzwerks).
+    """
+    buses = map_data["buses"]
+    if map_data["interest_buses"] is None:
+        return buses
+
+    names = set(map_data["interest_buses"])
+    for df in components:
+        names |= set(df['bus0']) | set(df['bus1'])
+    return buses[buses.index.isin(names)]
+
+def _base_map(map_data, gdf_buses):
     # === initiate map ===
-    m = folium.Map(location=[gdf_buses.geometry.y.mean(), gdf_buses.geometry.x.mean()], zoom_start=7)
+    m = folium.Map(
+        location=[gdf_buses.geometry.y.mean(), gdf_buses.geometry.x.mean()],
+        zoom_start=7,
+        prefer_canvas=map_data["rendering"]["prefer_canvas"]
+    )
 
     # insert title # -> optional
     #title = f"{etrago.name} – Buskarte"
@@ -48,329 +209,165 @@ def create_bus_map(etrago):
     #m.get_root().html.add_child(folium.Element(title_html))
 
     # === add NUTS-3 - regions ===
-    folium.GeoJson(
-        nuts,
-        name="NUTS-3 Regions",
-        tooltip=folium.GeoJsonTooltip(fields=["NUTS_NAME"], aliases=["Region: "]),
-        style_function=lambda x: {"fillColor": "gray", "color": "black", "weight": 1, "fillOpacity": 0.2}
-    ).add_to(m)
+    nuts_style = lambda x: {"fillColor": "gray", "color": "black", "weight": 1, "fillOpacity": 0.2}
+    nuts_tooltip = folium.GeoJsonTooltip(fields=["NUTS_NAME"], aliases=["Region: "])
+    if map_data["nuts_topology"] is not None:
+        folium.TopoJson(
+            map_data["nuts_topology"],
+            "objects.data",
+            name="NUTS-3 Regions",
+            tooltip=nuts_tooltip,
+            style_function=nuts_style
+        ).add_to(m)
+    else:
+        folium.GeoJson(
+            map_data["nuts_layer"],
+            name="NUTS-3 Regions",
+            tooltip=nuts_tooltip,
+            style_function=nuts_style
+        ).add_to(m)
 
-    # === colors by carrier ===
-    carriers = gdf_buses['carrier'].unique()
-    carrier_color_map, legend_order = get_carrier_color_map(carriers)
+    return m
 
-    # === plot buses ===
-    for _, row in gdf_buses.iterrows():
-        color = carrier_color_map[row['carrier']]
-        popup_text = f"<b>Bus:</b> {row['name']}<br><b>Carrier:</b> {row['carrier']}"
-        tooltip_text = f"{row['name']} ({row['carrier']})"
-        folium.CircleMarker(
-            location=[row.geometry.y, row.geometry.x],
-            radius=bussize,
-            color=color,
-            fill=True,
-            fill_color=color,
-            fill_opacity=0.9,
-            popup=popup_text,
-            tooltip=tooltip_text
-        ).add_to(m)
+def add_line_colorbar(m, norm, cmap, title="Farbskala: s_max_pu", left=30):
+    """
+    Fügt die Farbskala der Lines (s_max_pu) als Bild-Legende zur Karte hinzu.
+    """
+    fig, ax = plt.subplots(figsize=(4, 0.4))
+    fig.subplots_adjust(bottom=0.5)
+    cb1 = plt.colorbar(cm.ScalarMappable(norm=norm, cmap=cmap), cax=ax, orientation='horizontal')
+    cb1.set_label('s_max_pu')
 
-    # === LayerControl & Legend ===
-    folium.LayerControl().add_to(m)
-    add_carrier_legend_to_map(m, carrier_color_map, legend_order)
+    img = io.BytesIO()
+    plt.savefig(img, format='png', bbox_inches='tight')
+    plt.close(fig)
+    img.seek(0)
+    img_b64 = b64encode(img.read()).decode()
 
-    # === save busmap ===
+    legend_html = f"""
+    <div style="position: fixed;
+         bottom: 30px; left: {left}px; width: 300px; height: auto;
+         background-color: white; border:2px solid grey; z-index:9999; font-size:14px;
+         padding: 10px;">
+    <b>{title}</b><br>
+    <img src="data:image/png;base64,{img_b64}" style="width:100%;"/>
+    </div>
+    """
+    m.get_root().html.add_child(folium.Element(legend_html))
+
+def save_map(m, args, map_name, interest_map_name):
+    """
+    Speichert die Karte unter maps/maps_{area}/{map_name}_{area}.html bzw. mit
+    plot_comps_of_interest unter maps/maps_{area}/plot_of_interest/{interest_map_name}_{area}.html.
+    """
     area = args["interest_area"]
     directory = f"maps/maps_{area}"
-    os.makedirs(directory, exist_ok=True)
 
     if args["plot_settings"]["plot_comps_of_interest"]:
-        directory = f"maps/maps_{area}/plot_of_interest"
-        os.makedirs(directory, exist_ok=True)
-        output_file = os.path.join(directory, f"buses_of_interest_map_{area}.html")
+        directory = os.path.join(directory, "plot_of_interest")
+        output_file = os.path.join(directory, f"{interest_map_name}_{area}.html")
     else:
-        output_file = os.path.join(directory, f"bus_map_{area}.html")
+        output_file = os.path.join(directory, f"{map_name}_{area}.html")
 
+    os.makedirs(directory, exist_ok=True)
     m.save(output_file)
-    print(f"✅ Interaktive Bus-Karte gespeichert unter: {output_file}")
+    return output_file
 
-def create_links_map(etrago):
+def create_bus_map(etrago, map_data=None):
 
-    network = etrago.network
+    map_data = prepare_map_data(etrago) if map_data is None else map_data
     args = etrago.args
 
-    linkwidth = args.get("plot_settings", {}).get("linkwidth", 3)
+    bussize = args.get("plot_settings", {}).get("bussize", 6)
 
-    # load NUTS-3 Shapefile
-    nuts_3_map = args["nuts_3_map"]
-    nuts = gpd.read_file(nuts_3_map)
+    # === buses of interest area (or all buses) ===
+    gdf_buses = _shown_buses(map_data)
 
-    if args["plot_settings"]["plot_comps_of_interest"]:
-        # select buses and links of interest area
-        links = find_links_connected_to_interest_buses(etrago)
-        # Load all buses that appear in these links
-        used_buses = set(links['bus0']) | set(links['bus1'])
+    # === initiate map with NUTS-3 - regions ===
+    m = _base_map(map_data, gdf_buses)
 
-        all_buses = network.buses.copy()
-        all_buses["name"] = all_buses.index
-        filtered_buses = all_buses.loc[all_buses.index.isin(used_buses)]
-        gdf_buses = gpd.GeoDataFrame(
-            filtered_buses,
-            geometry=gpd.points_from_xy(filtered_buses['x'], filtered_buses['y']),
-            crs="EPSG:4326"
-        )
-        # transform bus_gdf into CRS of the NUTS-3 map
-        gdf_buses = gdf_buses.to_crs(nuts.crs)
-        # Move duplicates to avoid overlapping
-        gdf_buses = apply_jitter_to_duplicate_buses(gdf_buses, epsg_m=3857, jitter_radius=500)
+    # === colors by carrier ===
+    carriers = gdf_buses['carrier'].unique()
+    carrier_color_map, legend_order = get_carrier_color_map(carriers)
 
-    else:
-        # collect buses and links from network
-        buses = network.buses.copy()
-        buses["name"] = buses.index
-        links = network.links.copy()
-        gdf_buses = gpd.GeoDataFrame(buses, geometry=gpd.points_from_xy(buses['x'], buses['y']), crs="EPSG:4326")
-        # transform bus_gdf into CRS of the NUTS-3 map
-        gdf_buses = gdf_buses.to_crs(nuts.crs)
+    # === plot buses (one GeoJSON layer per carrier) ===
+    add_bus_layers(m, gdf_buses, carrier_color_map, legend_order, bussize, map_data["rendering"])
 
-    # Assign bus name to coordinates and carrier
-    bus_lookup = gdf_buses.set_index('name')[['geometry', 'carrier']]
+    # === LayerControl & Legend ===
+    folium.LayerControl().add_to(m)
+    add_carrier_legend_to_map(m, carrier_color_map, legend_order)
 
-    # === initiate map ===
-    m = folium.Map(location=[gdf_buses.geometry.y.mean(), gdf_buses.geometry.x.mean()], zoom_start=7)
+    # === save busmap ===
+    output_file = save_map(m, args, "bus_map", "buses_of_interest_map")
+    print(f"✅ Interaktive Bus-Karte gespeichert unter: {output_file}")
+    return output_file
 
-    # add NUTS-3 - regions
-    folium.GeoJson(
-        nuts,
-        name="NUTS-3 Regions",
-        tooltip=folium.GeoJsonTooltip(fields=["NUTS_NAME"], aliases=["Region: "]),
-        style_function=lambda x: {"fillColor": "gray", "color": "black", "weight": 1, "fillOpacity": 0.2}
-    ).add_to(m)
+def create_links_map(etrago, map_data=None):
+
+    map_data = prepare_map_data(etrago) if map_data is None else map_data
+    args = etrago.args
+
+    linkwidth = args.get("plot_settings", {}).get("linkwidth", 3)
+
+    links = map_data["links"]
+    gdf_buses = map_data["buses"]
+
+    # === initiate map with NUTS-3 - regions ===
+    m = _base_map(map_data, gdf_buses)
 
     # colors by carrier
     carriers = links['carrier'].unique()
     carrier_color_map, legend_order = get_link_carrier_color_map(carriers)
 
     # plot links
-    for _, row in links.iterrows():
-        try:
-            point0 = bus_lookup.loc[row['bus0'], 'geometry']
-            point1 = bus_lookup.loc[row['bus1'], 'geometry']
-            carrier = row['carrier']
-            color = carrier_color_map.get(carrier, "gray")
-
-            line = folium.PolyLine(
-                locations=[[point0.y, point0.x], [point1.y, point1.x]],
-                color=color,
-                weight=linkwidth,
-                opacity=0.8,
-                tooltip=f"{row['bus0']} → {row['bus1']} ({carrier})"
-            )
-            line.add_to(m)
-        except KeyError:
-            continue  # Busname nicht gefunden – überspringen
+    add_link_layers(m, links, gdf_buses, carrier_color_map, legend_order, linkwidth)
 
     # === LayerControl & Legend ===
     folium.LayerControl().add_to(m)
     add_carrier_legend_to_map(m, carrier_color_map, legend_order)
 
     # === save links_map ===
-    area = args["interest_area"]
-    directory = f"maps/maps_{area}"
-    os.makedirs(directory, exist_ok=True)
-
-    if args["plot_settings"]["plot_comps_of_interest"]:
-        directory = f"maps/maps_{area}/plot_of_interest"
-        os.makedirs(directory, exist_ok=True)
-        output_file = os.path.join(directory, f"links_interest_map_{area}.html")
-    else:
-        output_file = os.path.join(directory, f"links_map_{area}.html")
-
-    m.save(output_file)
+    output_file = save_map(m, args, "links_map", "links_interest_map")
     print(f"✅ Interaktive Link-Karte gespeichert unter: {output_file}")
+    return output_file
 
-def create_lines_map(etrago):
+def create_lines_map(etrago, map_data=None):
 
-    network = etrago.network
+    map_data = prepare_map_data(etrago) if map_data is None else map_data
     args = etrago.args
     linewidth = args.get("plot_settings", {}).get("linewidth", 3)
 
-    # load NUTS-3 Shapefile
-    nuts_3_map = args["nuts_3_map"]
-    nuts = gpd.read_file(nuts_3_map)
-
-    if args["plot_settings"]["plot_comps_of_interest"]:
-        # === filter lines connected to interest area ===
-        lines = network.lines.copy()
-        buses_interest = find_interest_buses(etrago)
-        bus_names = buses_interest.index.tolist()
-
-        # select only lines where either bus0 or bus1 is in area
-        lines = lines[
-            lines['bus0'].isin(bus_names) |
-            lines['bus1'].isin(bus_names)
-            ]
-
-        # build filtered bus dataframe for geometry
-        all_buses = network.buses.copy()
-        all_buses["name"] = all_buses.index
-        used_buses = set(lines['bus0']) | set(lines['bus1'])
-        filtered_buses = all_buses.loc[all_buses.index.isin(used_buses)]
-
-        gdf_buses = gpd.GeoDataFrame(
-            filtered_buses,
-            geometry=gpd.points_from_xy(filtered_buses['x'], filtered_buses['y']),
-            crs="EPSG:4326"
-        )
-        gdf_buses = gdf_buses.to_crs(nuts.crs)
-
-    else:
-        # === full network ===
-        lines = network.lines.copy()
-        buses = network.buses.copy()
-        buses["name"] = buses.index
-        gdf_buses = gpd.GeoDataFrame(buses, geometry=gpd.points_from_xy(buses['x'], buses['y']), crs="EPSG:4326")
-        gdf_buses = gdf_buses.to_crs(nuts.crs)
-
-    # === prepare bus lookup ===
-    bus_lookup = gdf_buses.set_index('name')['geometry']
-
-    # === color normalization (s_max_pu) ===
-    norm = mcolors.Normalize(vmin= network.lines['s_max_pu'].min(),
-                             vmax= network.lines['s_max_pu'].max())
-    cmap = cm.get_cmap('viridis')
+    lines = map_data["lines"]
+    gdf_buses = map_data["buses"]
 
-    def s_max_pu_to_hex(s):
-        rgba = cmap(norm(s))
-        return mcolors.to_hex(rgba)
-
-    # === initiate map ===
-    m = folium.Map(location=[gdf_buses.geometry.y.mean(), gdf_buses.geometry.x.mean()], zoom_start=7)
-
-    # === add NUTS-3 - regions ===
-    folium.GeoJson(
-        nuts,
-        name="NUTS-3 Regions",
-        tooltip=folium.GeoJsonTooltip(fields=["NUTS_NAME"], aliases=["Region: "]),
-        style_function=lambda x: {"fillColor": "gray", "color": "black", "weight": 1, "fillOpacity": 0.2}
-    ).add_to(m)
+    # === initiate map with NUTS-3 - regions ===
+    m = _base_map(map_data, gdf_buses)
 
     # === plot lines ===
-    for _, row in lines.iterrows():
-        try:
-            p0 = bus_lookup.loc[row['bus0']]
-            p1 = bus_lookup.loc[row['bus1']]
-            color = s_max_pu_to_hex(row['s_max_pu'])
-
-            folium.PolyLine(
-                locations=[[p0.y, p0.x], [p1.y, p1.x]],
-                color=color,
-                weight=linewidth,
-                opacity=0.9,
-                tooltip=f"{row['bus0']} → {row['bus1']}<br>s_max_pu: {row['s_max_pu']:.2f}"
-            ).add_to(m)
-        except KeyError:
-            continue
+    add_line_layer(m, lines, gdf_buses, map_data["line_norm"], map_data["line_cmap"], linewidth)
 
     # === add legend (colorbar image) ===
-    fig, ax = plt.subplots(figsize=(4, 0.4))
-    fig.subplots_adjust(bottom=0.5)
-
-    cb1 = plt.colorbar(
-        cm.ScalarMappable(norm=norm, cmap=cmap),
-        cax=ax,
-        orientation='horizontal'
-    )
-    cb1.set_label('s_max_pu')
-
-    img = io.BytesIO()
-    plt.savefig(img, format='png', bbox_inches='tight')
-    img.seek(0)
-    img_b64 = b64encode(img.read()).decode()
-
-    legend_html = f"""
-    <div style="position: fixed;
-         bottom: 30px; left: 30px; width: 300px; height: auto;
-         background-color: white; border:2px solid grey; z-index:9999; font-size:14px;
-         padding: 10px;">
-    <b>Farbskala: s_max_pu</b><br>
-    <img src="data:image/png;base64,{img_b64}" style="width:100%;"/>
-    </div>
-    """
-    m.get_root().html.add_child(folium.Element(legend_html))
+    add_line_colorbar(m, map_data["line_norm"], map_data["line_cmap"])
 
     # === save lines_map ===
-    area = args["interest_area"]
-    directory = f"maps/maps_{area}"
-    os.makedirs(directory, exist_ok=True)
-
-    if args["plot_settings"]["plot_comps_of_interest"]:
-        directory = os.path.join(directory, "plot_of_interest")
-        os.makedirs(directory, exist_ok=True)
-        output_file = os.path.join(directory, f"lines_interest_map_{area}.html")
-    else:
-        output_file = os.path.join(directory, f"lines_map_{area}.html")
-
-    m.save(output_file)
+    output_file = save_map(m, args, "lines_map", "lines_interest_map")
     print(f"✅ Interaktive Linien-Karte gespeichert unter: {output_file}")
+    return output_file
 
-def create_buses_and_links_map(etrago):
+def create_buses_and_links_map(etrago, map_data=None):
 
-    network = etrago.network
+    map_data = prepare_map_data(etrago) if map_data is None else map_data
     args = etrago.args
 
     bussize = args.get("plot_settings", {}).get("bussize", 6)
     linkwidth = args.get("plot_settings", {}).get("linkwidth", 3)
 
-    # === load NUTS-3 Shapefile ===
-    nuts_3_map = args["nuts_3_map"]
-    nuts = gpd.read_file(nuts_3_map)
-
-    if args["plot_settings"]["plot_comps_of_interest"]:
-        # Determine interest area buses directly
-        gdf_buses_interest = find_interest_buses(etrago)
-
-        # Left with at least one of these buses
-        links = find_links_connected_to_interest_buses(etrago)
-        linked_buses = set(links['bus0']) | set(links['bus1'])
-
-        # ALL buses that appear in links (for coordinates/lookup)
-        all_buses = network.buses.copy()
-        all_buses["name"] = all_buses.index
-        buses_for_lookup = all_buses.loc[all_buses.index.isin(linked_buses)]
+    links = map_data["links"]
+    # interest area buses and all buses connected by these links
+    gdf_buses = _shown_buses(map_data, [links])
 
-        gdf_buses_lookup = gpd.GeoDataFrame(
-            buses_for_lookup,
-            geometry=gpd.points_from_xy(buses_for_lookup['x'], buses_for_lookup['y']),
-            crs="EPSG:4326"
-        ).to_crs(nuts.crs)
-
-        # Combine interest buses and lookup buses
-        gdf_buses = pd.concat([gdf_buses_interest, gdf_buses_lookup])
-        gdf_buses = gdf_buses[~gdf_buses.index.duplicated(keep='first')]
-
-        # Move duplicates to avoid overlapping
-        gdf_buses = apply_jitter_to_duplicate_buses(gdf_buses, epsg_m=3857, jitter_radius=500)
-    else:
-        # === load all buses and links ===
-        buses = network.buses.copy()
-        buses["name"] = buses.index
-        gdf_buses = gpd.GeoDataFrame(buses, geometry=gpd.points_from_xy(buses['x'], buses['y']), crs="EPSG:4326").to_crs(nuts.crs)
-        links = network.links.copy()
-
-    # === create lookup for bus coordinates and carrier ===
-    bus_lookup = gdf_buses.set_index('name')[['geometry', 'carrier']]
-
-    # === initiate map ===
-    m = folium.Map(location=[gdf_buses.geometry.y.mean(), gdf_buses.geometry.x.mean()], zoom_start=7)
-
-    # === add NUTS-3 - regions ===
-    folium.GeoJson(
-        nuts,
-        name="NUTS-3 Regions",
-        tooltip=folium.GeoJsonTooltip(fields=["NUTS_NAME"], aliases=["Region: "]),
-        style_function=lambda x: {"fillColor": "gray", "color": "black", "weight": 1, "fillOpacity": 0.2}
-    ).add_to(m)
+    # === initiate map with NUTS-3 - regions ===
+    m = _base_map(map_data, gdf_buses)
 
     # === carrier colormaps ===
     carriers_buses = gdf_buses['carrier'].unique()
@@ -379,39 +376,11 @@ def create_buses_and_links_map(etrago):
     carriers_links = links['carrier'].unique()
     carrier_color_map_links, legend_order_links = get_link_carrier_color_map(carriers_links)
 
-    # === plot buses ===
-    for _, row in gdf_buses.iterrows():
-        color = carrier_color_map_buses.get(row['carrier'], "gray")
-        popup_text = f"<b>Bus:</b> {row['name']}<br><b>Carrier:</b> {row['carrier']}"
-        tooltip_text = f"{row['name']} ({row['carrier']})"
-        folium.CircleMarker(
-            location=[row.geometry.y, row.geometry.x],
-            radius=bussize,
-            color=color,
-            fill=True,
-            fill_color=color,
-            fill_opacity=0.9,
-            popup=popup_text,
-            tooltip=tooltip_text
-        ).add_to(m)
+    # === plot buses (one GeoJSON layer per carrier) ===
+    add_bus_layers(m, gdf_buses, carrier_color_map_buses, legend_order_buses, bussize, map_data["rendering"])
 
     # === plot links ===
-    for _, row in links.iterrows():
-        try:
-            point0 = bus_lookup.loc[row['bus0'], 'geometry']
-            point1 = bus_lookup.loc[row['bus1'], 'geometry']
-            carrier = row['carrier']
-            color = carrier_color_map_links.get(carrier, "gray")
-
-            folium.PolyLine(
-                locations=[[point0.y, point0.x], [point1.y, point1.x]],
-                color=color,
-                weight=linkwidth,
-                opacity=0.8,
-                tooltip=f"{row['bus0']} → {row['bus1']} ({carrier})"
-            ).add_to(m)
-        except KeyError:
-            continue
+    add_link_layers(m, links, gdf_buses, carrier_color_map_links, legend_order_links, linkwidth)
 
     # === LayerControl & Legend ===
     folium.LayerControl().add_to(m)
@@ -422,100 +391,26 @@ def create_buses_and_links_map(etrago):
     add_carrier_legend_to_map(m, carrier_color_map_links, legend_order_links, position="bottomright", title="Link-Carrier")
 
     # === save map ===
-    area = args["interest_area"]
-    directory = f"maps/maps_{area}"
-    os.makedirs(directory, exist_ok=True)
-
-    if args["plot_settings"]["plot_comps_of_interest"]:
-        directory = f"{directory}/plot_of_interest"
-        os.makedirs(directory, exist_ok=True)
-        output_file = os.path.join(directory, f"buses_links_interest_map_{area}.html")
-    else:
-        output_file = os.path.join(directory, f"buses_links_map_{area}.html")
-
-    m.save(output_file)
+    output_file = save_map(m, args, "buses_links_map", "buses_links_interest_map")
     print(f"✅ Interaktive Buses+Links-Karte gespeichert unter: {output_file}")
+    return output_file
 
-def create_buses_links_lines_map(etrago):
+def create_buses_links_lines_map(etrago, map_data=None):
 
-    network = etrago.network
+    map_data = prepare_map_data(etrago) if map_data is None else map_data
     args = etrago.args
 
     bussize = args.get("plot_settings", {}).get("bussize", 6)
     linkwidth = args.get("plot_settings", {}).get("linkwidth", 3)
     linewidth = args.get("plot_settings", {}).get("linewidth", 3)
 
-    # === load NUTS-3 Shapefile ===
-    nuts_3_map = args["nuts_3_map"]
-    nuts = gpd.read_file(nuts_3_map)
-
-    if args["plot_settings"]["plot_comps_of_interest"]:
-        # === Interest-Area-Busse direkt ermitteln ===
-        gdf_buses_interest = find_interest_buses(etrago)
-
-        # === Links & Lines mit mindestens einem Bus in Region ===
-        links = find_links_connected_to_interest_buses(etrago)
-        lines = network.lines.copy()
-        buses_interest_names = gdf_buses_interest.index.tolist()
-        lines = lines[
-            lines['bus0'].isin(buses_interest_names) |
-            lines['bus1'].isin(buses_interest_names)
-        ]
-
-        # === ALLE verbundenen Busse (für Koordinaten- und Farbanzeige) ===
-        all_buses = network.buses.copy()
-        all_buses["name"] = all_buses.index
-        buses_used = set(links['bus0']) | set(links['bus1']) | set(lines['bus0']) | set(lines['bus1'])
-        buses_for_lookup = all_buses.loc[all_buses.index.isin(buses_used)]
-
-        gdf_buses_lookup = gpd.GeoDataFrame(
-            buses_for_lookup,
-            geometry=gpd.points_from_xy(buses_for_lookup['x'], buses_for_lookup['y']),
-            crs="EPSG:4326"
-        ).to_crs(nuts.crs)
-
-        # === Combine Interest-Busse und alle benötigten Busse ===
-        gdf_buses = pd.concat([gdf_buses_interest, gdf_buses_lookup])
-        gdf_buses = gdf_buses[~gdf_buses.index.duplicated(keep='first')]
-
-        # === Jittering nur für Interest-Busse anwenden ===
-        gdf_buses = apply_jitter_to_duplicate_buses(gdf_buses, epsg_m=3857, jitter_radius=500)
+    links = map_data["links"]
+    lines = map_data["lines"]
+    # === Interest-Busse und alle verbundenen Busse ===
+    gdf_buses = _shown_buses(map_data, [links, lines])
 
-    else:
-        # === vollständiges Netz laden ===
-        links = network.links.copy()
-        lines = network.lines.copy()
-        buses = network.buses.copy()
-        buses["name"] = buses.index
-        gdf_buses = gpd.GeoDataFrame(
-            buses,
-            geometry=gpd.points_from_xy(buses['x'], buses['y']),
-            crs="EPSG:4326"
-        ).to_crs(nuts.crs)
-
-    # === Lookup für Buskoordinaten + Carrier ===
-    bus_lookup = gdf_buses.set_index('name')[['geometry', 'carrier']]
-
-    # === Farbskala für Linienintensität (basierend auf dem vollständigen Netz) ===
-    vmin = network.lines['s_max_pu'].min()
-    vmax = network.lines['s_max_pu'].max()
-    norm = mcolors.Normalize(vmin=vmin, vmax=vmax)
-    cmap = cm.get_cmap('viridis')
-
-    def s_max_pu_to_hex(s):
-        rgba = cmap(norm(s))
-        return mcolors.to_hex(rgba)
-
-    # === Karte initialisieren ===
-    m = folium.Map(location=[gdf_buses.geometry.y.mean(), gdf_buses.geometry.x.mean()], zoom_start=7)
-
-    # === NUTS-3-Grenzen hinzufügen ===
-    folium.GeoJson(
-        nuts,
-        name="NUTS-3 Regions",
-        tooltip=folium.GeoJsonTooltip(fields=["NUTS_NAME"], aliases=["Region: "]),
-        style_function=lambda x: {"fillColor": "gray", "color": "black", "weight": 1, "fillOpacity": 0.2}
-    ).add_to(m)
+    # === Karte mit NUTS-3-Grenzen initialisieren ===
+    m = _base_map(map_data, gdf_buses)
 
     # === Farbzuordnung für Carrier ===
     carriers_buses = gdf_buses['carrier'].unique()
@@ -524,56 +419,14 @@ def create_buses_links_lines_map(etrago):
     carriers_links = links['carrier'].unique()
     carrier_color_map_links, legend_order_links = get_link_carrier_color_map(carriers_links)
 
-    # === Busse plotten ===
-    for _, row in gdf_buses.iterrows():
-        color = carrier_color_map_buses.get(row['carrier'], "gray")
-        popup_text = f"<b>Bus:</b> {row['name']}<br><b>Carrier:</b> {row['carrier']}"
-        tooltip_text = f"{row['name']} ({row['carrier']})"
-        folium.CircleMarker(
-            location=[row.geometry.y, row.geometry.x],
-            radius=bussize,
-            color=color,
-            fill=True,
-            fill_color=color,
-            fill_opacity=0.9,
-            popup=popup_text,
-            tooltip=tooltip_text
-        ).add_to(m)
+    # === Busse plotten (eine GeoJSON-Ebene je Carrier) ===
+    add_bus_layers(m, gdf_buses, carrier_color_map_buses, legend_order_buses, bussize, map_data["rendering"])
 
     # === Links plotten ===
-    for _, row in links.iterrows():
-        try:
-            point0 = bus_lookup.loc[row['bus0'], 'geometry']
-            point1 = bus_lookup.loc[row['bus1'], 'geometry']
-            carrier = row['carrier']
-            color = carrier_color_map_links.get(carrier, "gray")
-
-            folium.PolyLine(
-                locations=[[point0.y, point0.x], [point1.y, point1.x]],
-                color=color,
-                weight=linkwidth,
-                opacity=0.8,
-                tooltip=f"{row['bus0']} → {row['bus1']} ({carrier})"
-            ).add_to(m)
-        except KeyError:
-            continue
+    add_link_layers(m, links, gdf_buses, carrier_color_map_links, legend_order_links, linkwidth)
 
     # === Lines plotten (farblich nach s_max_pu) ===
-    for _, row in lines.iterrows():
-        try:
-            p0 = bus_lookup.loc[row['bus0'], 'geometry']
-            p1 = bus_lookup.loc[row['bus1'], 'geometry']
-            color = s_max_pu_to_hex(row['s_max_pu'])
-
-            folium.PolyLine(
-                locations=[[p0.y, p0.x], [p1.y, p1.x]],
-                color=color,
-                weight=linewidth,
-                opacity=0.9,
-                tooltip=f"{row['bus0']} → {row['bus1']}<br>s_max_pu: {row['s_max_pu']:.2f}"
-            ).add_to(m)
-        except KeyError:
-            continue
+    add_line_layer(m, lines, gdf_buses, map_data["line_norm"], map_data["line_cmap"], linewidth)
 
     # === LayerControl + getrennte Legenden ===
     folium.LayerControl().add_to(m)
@@ -582,49 +435,286 @@ def create_buses_links_lines_map(etrago):
     add_carrier_legend_to_map(m, carrier_color_map_links, legend_order_links, position="bottomright", title="Link-Carrier")
 
     # === Farblegende für s_max_pu ===
-    fig, ax = plt.subplots(figsize=(4, 0.4))
-    fig.subplots_adjust(bottom=0.5)
-    cb1 = plt.colorbar(cm.ScalarMappable(norm=norm, cmap=cmap), cax=ax, orientation='horizontal')
-    cb1.set_label('s_max_pu')
+    add_line_colorbar(m, map_data["line_norm"], map_data["line_cmap"], title="Lines: s_max_pu", left=300)
 
-    img = io.BytesIO()
-    plt.savefig(img, format='png', bbox_inches='tight')
-    img.seek(0)
-    img_b64 = b64encode(img.read()).decode()
+    # === save map ===
+    output_file = save_map(m, args, "buses_links_lines_map", "buses_links_lines_interest_map")
+    print(f"✅ Interaktive Komplett-Karte gespeichert unter: {output_file}")
+    return output_file
 
-    legend_html = f"""
-    <div style="position: fixed;
-         bottom: 30px; left: 300px; width: 300px; height: auto;
-         background-color: white; border:2px solid grey; z-index:9999; font-size:14px;
-         padding: 10px;">
-    <b>Lines: s_max_pu</b><br>
-    <img src="data:image/png;base64,{img_b64}" style="width:100%;"/>
-    </div>
+def create_combined_map(etrago, map_data=None):
     """
-    m.get_root().html.add_child(folium.Element(legend_html))
+    Eine Karte mit Bussen, Links und Lines als schaltbare FeatureGroups im
+    LayerControl; die NUTS-3-Regionen werden nur einmal eingebettet.
+    """
+    map_data = prepare_map_data(etrago) if map_data is None else map_data
+    args = etrago.args
 
-    # === save map ===
-    area = args["interest_area"]
-    directory = f"maps/maps_{area}"
-    os.makedirs(directory, exist_ok=True)
+    bussize = args.get("plot_settings", {}).get("bussize", 6)
+    linkwidth = args.get("plot_settings", {}).get("linkwidth", 3)
+    linewidth = args.get("plot_settings", {}).get("linewidth", 3)
 
-    if args["plot_settings"]["plot_comps_of_interest"]:
-        directory = f"{directory}/plot_of_interest"
-        os.makedirs(directory, exist_ok=True)
-        output_file = os.path.join(directory, f"buses_links_lines_interest_map_{area}.html")
-    else:
-        output_file = os.path.join(directory, f"buses_links_lines_map_{area}.html")
+    links = map_data["links"]
+    lines = map_data["lines"]
+    gdf_buses = _shown_buses(map_data, [links, lines])
 
-    m.save(output_file)
-    print(f"✅ Interaktive Komplett-Karte gespeichert unter: {output_file}")
+    m = _base_map(map_data, gdf_buses)
+
+    carrier_color_map_buses, legend_order_buses = get_carrier_color_map(gdf_buses['carrier'].unique())
+    carrier_color_map_links, legend_order_links = get_link_carrier_color_map(links['carrier'].unique())
+
+    # === eine FeatureGroup je Komponententyp ===
+    lines_group = folium.FeatureGroup(name="Lines").add_to(m)
+    add_line_layer(lines_group, lines, gdf_buses, map_data["line_norm"], map_data["line_cmap"], linewidth)
+
+    links_group = folium.FeatureGroup(name="Links").add_to(m)
+    add_link_layers(links_group, links, gdf_buses, carrier_color_map_links, legend_order_links, linkwidth)
+
+    buses_group = folium.FeatureGroup(name="Busse").add_to(m)
+    add_bus_layers(buses_group, gdf_buses, carrier_color_map_buses, legend_order_buses, bussize, map_data["rendering"])
+
+    # === LayerControl + Legenden ===
+    folium.LayerControl(collapsed=False).add_to(m)
+
+    add_carrier_legend_to_map(m, carrier_color_map_buses, legend_order_buses, position="bottomleft", title="Bus-Carrier")
+    add_carrier_legend_to_map(m, carrier_color_map_links, legend_order_links, position="bottomright", title="Link-Carrier")
+    add_line_colorbar(m, map_data["line_norm"], map_data["line_cmap"], title="Lines: s_max_pu", left=300)
+
+    output_file = save_map(m, args, "combined_map", "combined_interest_map")
+    print(f"✅ Interaktive Gesamtkarte gespeichert unter: {output_file}")
+    return output_file
+
+def _bus_style(feature):
+    color = feature["properties"]["color"]
+    return {"color": color, "fillColor": color}
+
+def add_bus_layers(m, gdf_buses, carrier_color_map, legend_order, bussize, rendering=None):
+    """
+    Fügt die Busse als eine GeoJSON-FeatureCollection je Carrier zur Karte hinzu.
+
+    Farbe, Tooltip und Popup kommen aus den Feature-Properties ('name',
+    'carrier', 'color'); statt eines CircleMarker-Objekts je Bus entsteht so
+    nur eine Ebene je Carrier, die im LayerControl einzeln schaltbar ist.
+    Mit rendering["cluster"] liegt jede Ebene in einem MarkerCluster, der
+    sich ab rendering["lod_zoom"] in einzelne Busse auflöst.
+
+    Parameters
+    ----------
+    m : folium.Map
+    gdf_buses : GeoDataFrame
+        Busse mit Spalten 'name', 'carrier' und Punkt-Geometrien.
+    carrier_color_map : dict
+        Carrier -> Farbe, unbekannte Carrier werden grau dargestellt.
+    legend_order : list
+        Reihenfolge der Ebenen.
+    bussize : float
+        Radius der Marker in Pixeln.
+    rendering : dict, optional
+        Ergebnis von large_network_rendering; Standard: ohne Cluster.
+    """
+    cluster = rendering is not None and rendering["cluster"]
+
+    buses = gdf_buses[["name", "carrier", "geometry"]].copy()
+    buses["name"] = buses["name"].astype(str)
+    buses["carrier"] = buses["carrier"].astype(str)
+    buses["color"] = buses["carrier"].map(carrier_color_map).fillna("gray")
+
+    layers = dict(tuple(buses.groupby("carrier", sort=False)))
+    for carrier in [c for c in legend_order if c in layers] + [c for c in layers if c not in legend_order]:
+        parent = m
+        if cluster:
+            parent = MarkerCluster(
+                name=f"Busse: {carrier}",
+                options={"disableClusteringAtZoom": rendering["lod_zoom"]}
+            ).add_to(m)
+
+        folium.GeoJson(
+            layers[carrier],
+            name=f"Busse: {carrier}",
+            marker=folium.CircleMarker(radius=bussize, fill=True, fill_opacity=0.9),
+            style_function=_bus_style,
+            tooltip=folium.GeoJsonTooltip(fields=["name", "carrier"], aliases=["Bus:", "Carrier:"]),
+            popup=folium.GeoJsonPopup(fields=["name", "carrier"], aliases=["Bus:", "Carrier:"]),
+        ).add_to(parent)
+
+def component_segments(components, gdf_buses, kind="Links"):
+    """
+    Verbindet bus0/bus1 der Komponenten in einem Join mit den Buskoordinaten
+    und baut alle Liniensegmente auf einmal.
+
+    Komponenten, deren bus0 oder bus1 nicht in gdf_buses enthalten ist, werden
+    verworfen; ihre Anzahl wird geloggt.
+
+    Parameters
+    ----------
+    components : pd.DataFrame
+        Links oder Lines mit Spalten 'bus0', 'bus1'.
+    gdf_buses : GeoDataFrame
+        Busse mit Spalte 'name' und Punkt-Geometrien.
+    kind : str
+        Bezeichnung für die Log-Meldung.
+
+    Returns
+    -------
+    GeoDataFrame
+        Komponenten mit LineString-Geometrie (bus0 -> bus1) im CRS der Busse.
+    """
+    coords = pd.DataFrame(
+        {"x": gdf_buses.geometry.x.to_numpy(), "y": gdf_buses.geometry.y.to_numpy()},
+        index=gdf_buses["name"].astype(str)
+    )
+    coords = coords[~coords.index.duplicated(keep="first")]
+
+    joined = (
+        components
+        .join(coords.add_suffix("0"), on="bus0")
+        .join(coords.add_suffix("1"), on="bus1")
+    )
+    matched = joined[["x0", "y0", "x1", "y1"]].notna().all(axis=1)
+    n_dropped = int((~matched).sum())
+    if n_dropped:
+        logger.info(f"{kind}: {n_dropped} von {len(joined)} ohne Buskoordinaten werden nicht dargestellt")
+    joined = joined[matched]
+
+    # (n, 2 Punkte, x/y)
+    points = np.stack([joined[["x0", "y0"]].to_numpy(), joined[["x1", "y1"]].to_numpy()], axis=1)
+    return gpd.GeoDataFrame(
+        joined.drop(columns=["x0", "y0", "x1", "y1"]),
+        geometry=shapely.linestrings(points),
+        crs=gdf_buses.crs
+    )
+
+def _segment_style(feature):
+    properties = feature["properties"]
+    return {"color": properties["color"], "weight": properties["weight"], "opacity": properties["opacity"]}
+
+def add_link_layers(m, links, gdf_buses, carrier_color_map, legend_order, linkwidth):
+    """
+    Fügt die Links als eine GeoJSON-Ebene (alle Segmente) je Carrier zur Karte hinzu.
+    """
+    segments = component_segments(links, gdf_buses, kind="Links")
+    segments = segments[["bus0", "bus1", "carrier", "geometry"]].astype({"bus0": str, "bus1": str, "carrier": str})
+    segments["color"] = segments["carrier"].map(carrier_color_map).fillna("gray")
+    segments["weight"] = linkwidth
+    segments["opacity"] = 0.8
+
+    layers = dict(tuple(segments.groupby("carrier", sort=False)))
+    for carrier in [c for c in legend_order if c in layers] + [c for c in layers if c not in legend_order]:
+        folium.GeoJson(
+            layers[carrier],
+            name=f"Links: {carrier}",
+            style_function=_segment_style,
+            tooltip=folium.GeoJsonTooltip(fields=["bus0", "bus1", "carrier"], aliases=["von:", "nach:", "Carrier:"]),
+        ).add_to(m)
+
+def add_line_layer(m, lines, gdf_buses, norm, cmap, linewidth):
+    """
+    Fügt alle Lines als eine GeoJSON-Ebene hinzu, farblich nach s_max_pu.
+    """
+    segments = component_segments(lines, gdf_buses, kind="Lines")
+    if segments.empty:
+        return
+    segments = segments[["bus0", "bus1", "s_max_pu", "geometry"]].astype({"bus0": str, "bus1": str})
+    segments["color"] = [mcolors.to_hex(rgba) for rgba in cmap(norm(segments["s_max_pu"].to_numpy()))]
+    segments["s_max_pu"] = segments["s_max_pu"].round(2)
+    segments["weight"] = linewidth
+    segments["opacity"] = 0.9
+
+    folium.GeoJson(
+        segments,
+        name="Lines",
+        style_function=_segment_style,
+        tooltip=folium.GeoJsonTooltip(fields=["bus0", "bus1", "s_max_pu"], aliases=["von:", "nach:", "s_max_pu:"]),
+    ).add_to(m)
+
+MAP_MODES = ("separate", "combined", "both")
 
 def create_maps(etrago):
-    create_bus_map(etrago)
-    create_links_map(etrago)
-    create_lines_map(etrago)
-    create_buses_and_links_map(etrago)
-    create_buses_links_lines_map(etrago)
+    """
+    Erzeugt die Karten aus einmal vorbereiteten Daten (siehe prepare_map_data).
+
+    args["plot_settings"]["map_mode"]:
+        "separate" (Standard): Bus-, Link-, Linien-, Bus+Link- und Komplett-Karte
+        "combined": eine Karte mit schaltbaren Ebenen (create_combined_map)
+        "both": beides
+    """
+    mode = etrago.args["plot_settings"].get("map_mode", "separate")
+    if mode not in MAP_MODES:
+        raise ValueError(f"Unbekannter map_mode '{mode}', erlaubt: {MAP_MODES}")
+
+    map_data = prepare_map_data(etrago)
 
+    if mode in ("combined", "both"):
+        create_combined_map(etrago, map_data)
+
+    if mode in ("separate", "both"):
+        create_bus_map(etrago, map_data)
+        create_links_map(etrago, map_data)
+        create_lines_map(etrago, map_data)
+        create_buses_and_links_map(etrago, map_data)
+        create_buses_links_lines_map(etrago, map_data)
+
+
+def interest_cache_key(etrago):
+    """
+    Cache-Schlüssel für find_interest_buses: interest_area, Pfad und
+    mtime der NUTS-3 GeoJSON sowie die Identität des PyPSA-Netzwerks.
+    """
+    args = etrago.args
+    area_filter = args["interest_area"]
+    area_key = (area_filter,) if isinstance(area_filter, str) else tuple(area_filter)
+
+    return (area_key,) + bus_regions_cache_key(etrago)
+
+def bus_regions_cache_key(etrago):
+    """
+    Cache-Schlüssel für find_bus_regions: Pfad und mtime der NUTS-3 GeoJSON
+    sowie die Identität des PyPSA-Netzwerks.
+    """
+    nuts_path = os.path.abspath(etrago.args["nuts_3_map"])
+
+    return nuts_path, os.path.getmtime(nuts_path), id(etrago.network)
+
+def cached_on_etrago(etrago, cache_name, key, compute):
+    """
+    Liefert compute(etrago) aus dem Cache-Dictionary ``cache_name`` des
+    Etrago-Objekts. Objekte ohne Cache rechnen jedes Mal neu.
+    """
+    cache = getattr(etrago, cache_name, None)
+    if cache is None:
+        return compute(etrago)
+
+    entry = cache.get(key)
+    # id() kann nach dem Löschen eines Netzwerks wiederverwendet werden
+    if entry is None or entry[0]() is not etrago.network:
+        entry = (weakref.ref(etrago.network), compute(etrago))
+        cache[key] = entry
+
+    return entry[1]
+
+def find_bus_regions(etrago):
+    """
+    Ordnet alle Busse des Netzwerks in einem räumlichen Join ihrer NUTS-3-Region zu.
+
+    Das Ergebnis wird auf dem Etrago-Objekt (``_bus_regions_cache``) zwischengespeichert
+    und zusätzlich als Datei im csv_folder abgelegt (siehe bus_regions.py).
+
+    Returns
+    -------
+    pd.Series
+        Kategorische Series Bus -> NUTS_NAME (NaN außerhalb aller Regionen).
+    """
+    return cached_on_etrago(
+        etrago, "_bus_regions_cache", bus_regions_cache_key(etrago), _compute_bus_regions
+    )
+
+def _compute_bus_regions(etrago):
+    logger.debug("Ordne Busse den NUTS-3-Regionen zu")
+
+    # persistente Zuordnung neben dem Ergebnisordner (falls bekannt)
+    return load_or_assign_bus_regions(
+        etrago.network.buses, etrago.args["nuts_3_map"], csv_folder=getattr(etrago, "csv_folder", None)
+    )
 
 def find_interest_buses(etrago):
     """
@@ -632,41 +722,46 @@ def find_interest_buses(etrago):
     in args["interest_area"] als Teilstring vorkommt.
 
     args["interest_area"] ist eine Liste von Namensfragmenten.
+
+    Das Ergebnis wird auf dem Etrago-Objekt (``_interest_buses_cache``)
+    zwischengespeichert, sodass die räumliche Auswertung pro Netzwerk,
+    interest_area und GeoJSON nur einmal durchgeführt wird.
+    Mit ``etrago.invalidate_interest_cache()`` wird der Cache geleert.
     """
-    n = etrago.network.copy()
-    args = etrago.args
+    buses_in_area = cached_on_etrago(
+        etrago, "_interest_buses_cache", interest_cache_key(etrago), _compute_interest_buses
+    )
+
+    return buses_in_area.copy()
 
-    # GeoJSON einlesen
-    nuts = gpd.read_file(args["nuts_3_map"])
-    nuts["NUTS_NAME"] = nuts["NUTS_NAME"].str.strip()
+def _compute_interest_buses(etrago):
+    n = etrago.network
+    args = etrago.args
 
-    # Matchen über str.contains für alle Einträge in args["interest_area"]
+    # Regionen, deren Name einen Eintrag aus args["interest_area"] enthält (GeoJSON-Cache)
     area_filter = args["interest_area"]
-    mask = nuts["NUTS_NAME"].apply(lambda name: any(area.lower() in name.lower() for area in area_filter))
-    interest_area = nuts[mask]
+    interest_area, _ = interest_regions(args["nuts_3_map"], area_filter)
 
     if interest_area.empty:
         raise ValueError(f"Keine Region mit Teilstrings {area_filter} in GeoJSON gefunden.")
 
+    # Busse über die Bus-Regionen-Zuordnung auswählen (kein Punkt-in-Polygon-Test je Anfrage)
+    bus_names = buses_in_regions(find_bus_regions(etrago), interest_area["NUTS_NAME"])
+    selected = static_table(n, "buses")
+    selected = selected[selected.index.isin(bus_names)]
+
     # Busse zu GeoDataFrame
-    buses = gpd.GeoDataFrame(
-        n.buses.copy(),
-        geometry=gpd.points_from_xy(n.buses.x, n.buses.y),
+    buses_in_area = gpd.GeoDataFrame(
+        selected,
+        geometry=gpd.points_from_xy(selected.x, selected.y),
         crs="EPSG:4326"
     )
 
     # index als Spalte speichern
-    buses["name"] = buses.index
+    buses_in_area["name"] = buses_in_area.index
 
     # CRS-Anpassung
-    buses = buses.to_crs(interest_area.crs)
-
-    # Leere Geometrien ausschließen
-    interest_area = interest_area[~interest_area.geometry.is_empty & interest_area.geometry.notnull()]
-
-    # Räumlicher Schnitt
-    buses_in_area = buses[buses.geometry.within(interest_area.unary_union)]
-    #buses_in_area = buses[buses.geometry.within(interest_area.buffer(0.005).unary_union)]
+    buses_in_area = buses_in_area.to_crs(interest_area.crs)
 
     # print(f"{len(buses_in_area)} Busse in {area_filter} gefunden.")
 
@@ -680,14 +775,29 @@ def find_links_connected_to_interest_buses(etrago):
     buses_of_interest = gdf_buses_interest.index.tolist()
 
     # Links where bus0 or bus1 is in the area of interest
-    links = network.links.copy()
-    connected_links = links[
-        (links["bus0"].isin(buses_of_interest)) |
-        (links["bus1"].isin(buses_of_interest))
-    ]
+    connected_links = components_at_buses(network, "links", buses_of_interest)
 
     return connected_links
 
+def interest_area_selection(etrago):
+    """
+    Komponentenauswahl für das Interessengebiet: Busse im Gebiet sowie alle
+    Links, Lines, Generatoren, Speicher und Lasten, die an diese Busse angeschlossen sind.
+
+    Returns
+    -------
+    dict
+        Komponentenliste (z.B. "links") -> Liste der Komponentennamen.
+    """
+    network = etrago.network
+    bus_list = find_interest_buses(etrago).index
+
+    selection = {"buses": bus_list.tolist()}
+    for list_name in ["links", "lines", "generators", "storage_units", "stores", "loads"]:
+        selection[list_name] = components_at_buses(network, list_name, bus_list).index.tolist()
+
+    return selection
+
 def apply_jitter_to_duplicate_buses(gdf_buses, epsg_m=3857, jitter_radius=500):
     """
     Verschiebt Busse mit identischen Koordinaten leicht, damit sie in Karten
@@ -709,21 +819,32 @@ def apply_jitter_to_duplicate_buses(gdf_buses, epsg_m=3857, jitter_radius=500):
 
     original_crs = gdf_buses.crs
     gdf_proj = gdf_buses.to_crs(epsg=epsg_m)
-
-    # Koordinaten als Tupel extrahieren
-    coord_series = gdf_proj.geometry.apply(lambda g: (round(g.x, 1), round(g.y, 1)))
-    coord_counts = coord_series.value_counts()
-
-    # Koordinaten mit mehrfach belegten Punkten
-    duplicate_coords = coord_counts[coord_counts > 1].index
-
-    for coord in duplicate_coords:
-        idxs = coord_series[coord_series == coord].index
-        for i, idx in enumerate(idxs):
-            angle = 2 * np.pi * i / len(idxs)
-            dx = jitter_radius * np.cos(angle)
-            dy = jitter_radius * np.sin(angle)
-            gdf_proj.at[idx, 'geometry'] = translate(gdf_proj.at[idx, 'geometry'], xoff=dx, yoff=dy)
+    if gdf_proj.empty:
+        return gdf_proj.to_crs(original_crs)
+
+    x = gdf_proj.geometry.x.to_numpy()
+    y = gdf_proj.geometry.y.to_numpy()
+
+    # Gruppen identischer (auf 0.1 gerundeter) Koordinaten
+    rounded = np.column_stack([np.round(x, 1), np.round(y, 1)])
+    _, group, counts = np.unique(rounded, axis=0, return_inverse=True, return_counts=True)
+    group = group.ravel()
+
+    # Rang jedes Busses innerhalb seiner Gruppe (in Zeilenreihenfolge)
+    order = np.argsort(group, kind="stable")
+    group_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(len(group), dtype=np.int64)
+    rank[order] = np.arange(len(group)) - group_start[group[order]]
+
+    # Busse mehrfach belegter Koordinaten gleichmäßig auf einem Kreis verteilen
+    size = counts[group]
+    angle = 2 * np.pi * rank / size
+    duplicate = size > 1
+    dx = np.where(duplicate, jitter_radius * np.cos(angle), 0.0)
+    dy = np.where(duplicate, jitter_radius * np.sin(angle), 0.0)
+
+    gdf_proj = gdf_proj.copy()
+    gdf_proj[gdf_proj.geometry.name] = gpd.points_from_xy(x + dx, y + dy, crs=gdf_proj.crs)
 
     # zurücktransformieren in ursprüngliches CRS
     return gdf_proj.to_crs(original_crs)
@@ -0,0 +1,70 @@
+"""
+Rendering of several matplotlib figures, sequentially or in a process pool.
+
+The plot data is computed once in the calling process; a figure job only
+holds a render function (module level, e.g. plot_base_results.render_*),
+its keyword arguments and the target file. Workers use the non-interactive
+Agg backend, so rasterisation and PNG compression of the figures run in
+parallel. The file names are fixed by the jobs and do not depend on the
+order in which the workers finish.
+"""
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# render(**kwargs) must write the figure to filepath
+FigureJob = namedtuple("FigureJob", ["render", "kwargs", "filepath"])
+
+
+def _use_agg():
+    # worker initializer only, the calling process keeps its backend
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+def render_job(job):
+    """
+    Renders one FigureJob and returns its wall time in seconds.
+
+    Must stay a module-level function so that it can be sent to worker processes.
+    """
+    start = time.perf_counter()
+    job.render(filepath=job.filepath, **job.kwargs)
+    return time.perf_counter() - start
+
+
+def render_figures(jobs, n_workers=1):
+    """
+    Renders all figure jobs and logs the wall time per figure.
+
+    Parameters
+    ----------
+    jobs : list of FigureJob
+    n_workers : int
+        Number of worker processes; 1 renders in this process.
+
+    Returns
+    -------
+    dict
+        filepath -> render wall time [s], in job order.
+    """
+    filepaths = [job.filepath for job in jobs]
+    if len(set(filepaths)) != len(filepaths):
+        raise ValueError("Figure jobs must write to distinct files.")
+
+    start = time.perf_counter()
+    if n_workers <= 1 or len(jobs) <= 1:
+        timings = [render_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(jobs)), initializer=_use_agg) as pool:
+            timings = list(pool.map(render_job, jobs))
+    total = time.perf_counter() - start
+
+    report = dict(zip(filepaths, timings))
+    for filepath, seconds in report.items():
+        logger.info(f"Rendered {filepath} in {seconds:.2f} s")
+    logger.info(f"Rendered {len(jobs)} figures in {total:.2f} s (sum of figures: {sum(timings):.2f} s)")
+    return report
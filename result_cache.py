@@ -0,0 +1,104 @@
+"""
+On-disk cache for per-scenario evaluation results.
+
+A result is stored under a key built from
+- the SHA-256 of the scenario folder's CSV files (names and contents),
+- the interest area, the NUTS-3 GeoJSON content and further result-relevant
+  args (marginal price bus, compact mode),
+- the evaluation function (module.qualname) including the bound arguments
+  of a functools.partial, and CALC_VERSION of calc_base_results.
+
+The scenario label is not part of the key: renaming a legend entry must not
+invalidate the cache, so evaluation functions may use the label only for
+names that the caller overwrites.
+
+Warm runs read the stored results and skip loading the network. Bump
+CALC_VERSION whenever the extraction functions change their results.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+
+from calc_base_results import CALC_VERSION
+from geometry_cache import file_sha256
+from network_loader import table_names
+
+logger = logging.getLogger(__name__)
+
+
+def folder_content_hash(folder):
+    """
+    Returns the SHA-256 of all CSV files in a result folder (names and contents).
+
+    Unlike network_loader.folder_fingerprint (name, size, mtime) this also
+    detects results copied with preserved timestamps (e.g. ``cp -p``).
+    """
+    digest = hashlib.sha256()
+    for name in table_names(folder):
+        digest.update(f"{name}:{file_sha256(os.path.join(folder, f'{name}.csv'))};".encode())
+    return digest.hexdigest()
+
+
+def _key_value(value):
+    """
+    json.dumps default for the cache key: functions and functools.partial
+    objects by their qualified name and bound arguments. Other objects are
+    rejected, their repr may contain memory addresses that differ per run.
+    """
+    if isinstance(value, functools.partial):
+        return {"func": value.func, "args": list(value.args), "keywords": value.keywords}
+    qualname = getattr(value, "__qualname__", None)
+    if callable(value) and qualname is not None and "<" not in qualname:
+        return f"{value.__module__}.{qualname}"
+    raise TypeError(
+        f"{value!r} kann nicht Teil des Ergebnis-Cache-Schlüssels sein "
+        f"(erlaubt: JSON-Werte, Funktionen auf Modulebene, functools.partial)."
+    )
+
+
+def result_key(folder, args, evaluate):
+    """
+    Returns the cache key of evaluate(Etrago1(args, folder), label).
+    """
+    area = args["interest_area"]
+    key = {
+        "folder": folder_content_hash(folder),
+        "interest_area": [area] if isinstance(area, str) else list(area),
+        "nuts_3_map": file_sha256(args["nuts_3_map"]),
+        "marginal_price_bus": args.get("marginal_price_bus"),
+        "compact": args.get("load_settings", {}).get("compact", False),
+        # functools.partial: the bound arguments change the result as well
+        "evaluate": evaluate,
+        "calc_version": CALC_VERSION,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, default=_key_value).encode()).hexdigest()[:24]
+
+
+def load_result(cache_folder, key):
+    """
+    Returns the cached result for ``key`` or None.
+    """
+    path = os.path.join(cache_folder, f"{key}.pkl")
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        logger.warning(f"Ergebnis-Cache {path} nicht lesbar: {e}")
+        return None
+
+
+def store_result(cache_folder, key, result):
+    """
+    Stores a result under ``key``.
+    """
+    os.makedirs(cache_folder, exist_ok=True)
+    path = os.path.join(cache_folder, f"{key}.pkl")
+    # write to a temporary file first, worker processes may store in parallel
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pd.to_pickle(result, tmp_path)
+    os.replace(tmp_path, path)
@@ -0,0 +1,140 @@
+"""
+Evaluation of several eTraGo scenarios, sequentially or in a process pool.
+
+Each scenario is loaded as Etrago1 and passed to an evaluation function that
+returns only the small per-scenario results (e.g. capacity or generation
+frames). With a process pool the networks never leave the worker processes.
+Results are returned in the order of the given scenarios.
+
+iter_scenarios streams the scenarios one at a time and releases each
+network before the next one is loaded, so peak memory is bounded by a
+single scenario regardless of the sweep size.
+
+With args["result_cache_folder"] set, results are cached on disk per
+scenario (see result_cache.py); cached scenarios are not loaded at all.
+"""
+import gc
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from network_visual import Etrago1
+from result_cache import load_result, result_key, store_result
+
+logger = logging.getLogger(__name__)
+
+
+class ScenarioError(RuntimeError):
+    """
+    Raised when loading or evaluating a scenario fails.
+    """
+
+    def __init__(self, label, folder, error):
+        super().__init__(f"Szenario '{label}' ({folder}) fehlgeschlagen: {error!r}")
+        self.label = label
+        self.folder = folder
+
+
+def evaluate_scenario_folder(folder, label, args, evaluate):
+    """
+    Loads one scenario folder and returns evaluate(etrago, label), or the
+    cached result if args["result_cache_folder"] holds one.
+
+    Must stay a module-level function so that it can be sent to worker processes.
+    """
+    cache_folder = args.get("result_cache_folder")
+    if cache_folder:
+        key = result_key(folder, args, evaluate)
+        result = load_result(cache_folder, key)
+        if result is not None:
+            logger.info(f"Using cached results for scenario: {label}")
+            return result
+
+    logger.info(f"Loading scenario: {label} from {folder}")
+    etrago = Etrago1(args, csv_folder=folder)
+    result = evaluate(etrago, label)
+
+    if cache_folder:
+        store_result(cache_folder, key, result)
+    return result
+
+
+def iter_scenarios(folders, labels, args, evaluate):
+    """
+    Loads, evaluates and releases the scenarios one after another.
+
+    Parameters
+    ----------
+    folders, labels, args, evaluate
+        See run_scenarios.
+
+    Yields
+    ------
+    tuple
+        (label, result) in scenario order.
+    """
+    for folder, label in zip(folders, labels):
+        try:
+            result = evaluate_scenario_folder(folder, label, args, evaluate)
+        except Exception as e:
+            raise ScenarioError(label, folder, e) from e
+        # the network is unreferenced now; collect reference cycles before loading the next one
+        gc.collect()
+        yield label, result
+
+
+def run_scenarios(folders, labels, args, evaluate, n_workers=1):
+    """
+    Evaluates all scenarios and returns their results in scenario order.
+
+    Parameters
+    ----------
+    folders : list of str
+        PyPSA result folders.
+    labels : list of str
+        Scenario labels, same order as folders.
+    args : dict
+        Arguments for Etrago1.
+    evaluate : callable
+        evaluate(etrago, label) -> result. For n_workers > 1 it must be
+        picklable, i.e. a module-level function (or functools.partial of one).
+    n_workers : int
+        Number of worker processes; 1 evaluates in this process.
+
+    Returns
+    -------
+    list
+        One result per scenario.
+
+    Raises
+    ------
+    ScenarioError
+        For the first scenario (in scenario order) that failed.
+    """
+    if len(folders) != len(labels):
+        raise ValueError(
+            f"Number of folders ({len(folders)}) does not match number of labels ({len(labels)})."
+        )
+
+    if n_workers <= 1:
+        return [result for _, result in iter_scenarios(folders, labels, args, evaluate)]
+
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(folders))) as pool:
+        futures = [
+            pool.submit(evaluate_scenario_folder, folder, label, args, evaluate)
+            for folder, label in zip(folders, labels)
+        ]
+
+        results = []
+        failed = []
+        for future, folder, label in zip(futures, folders, labels):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Szenario '{label}' ({folder}) fehlgeschlagen: {e!r}")
+                failed.append((label, folder, e))
+
+    if failed:
+        label, folder, error = failed[0]
+        raise ScenarioError(label, folder, error) from error
+
+    return results
@@ -4,7 +4,7 @@ import pandas as pd
 import numpy as np
 
 from calc_results import capacities_opt, capacities_opt_techs_global, plot_capacity_bar_multiple
-from network_visual import Etrago1
+from scenario_runner import run_scenarios
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -20,28 +20,39 @@ args = {
     "network_clustering": {"n_clusters_AC": 30, "n_clusters_gas": 14},
     "name": "Ingolstadt_30_14",
     "plot_settings": {"plot_comps_of_interest": True, "bussize": 10, "linkwidth": 5, "linewidth": 3},
+    "n_workers": 1,  # Anzahl paralleler Prozesse für das Laden der Szenarien
 }
 
 
 def load_scenario_paths(folder, labels):
-    """Ordnet Dateinamen im Ordner den gegebenen Labels zu (alphabetisch sortiert)."""
-    files = sorted(os.listdir(folder))
+    """Ordnet die Szenario-Unterordner den gegebenen Labels zu (alphabetisch sortiert)."""
+    # nur Szenario-Ordner, keine Dateien oder versteckten Cache-Ordner (z.B. .bus_regions)
+    files = sorted(
+        f for f in os.listdir(folder)
+        if not f.startswith(".") and os.path.isdir(os.path.join(folder, f))
+    )
     if len(files) < len(labels):
         raise ValueError("Nicht genügend Dateien im Szenario-Ordner gefunden.")
     return [os.path.join(folder, f) for f in files[:len(labels)]]
 
 
+def evaluate_capacities(etrago, label):
+    """Globale optimierte Kapazitäten eines Szenarios, aufgeteilt nach Technologiegruppen."""
+    cap_opt, _ = capacities_opt(etrago, scn=label)
+    return capacities_opt_techs_global(cap_opt)
+
+
 def run_scenario_comparison(args):
     scenario_paths = load_scenario_paths(args["scenario_folder"], args["scenario_labels"])
+    labels = args["scenario_labels"]
 
     # Datenstrukturen für alle Technologien vorbereiten
     h2_list_1, h2_list_2, stores_list_1, stores_list_2, charger_list, bat_list = [], [], [], [], [], []
 
-    for i, (label, path) in enumerate(zip(args["scenario_labels"], scenario_paths)):
-        logger.info(f"Lade Szenario: {label} aus {path}")
-        etrago = Etrago1(args, csv_folder=path)
-        cap_opt, _ = capacities_opt(etrago, scn=label)
-        df_H2_1, df_H2_2, df_stores_1, df_stores_2, df_charger, df_bat = capacities_opt_techs_global(cap_opt)
+    # Szenarien laden und auswerten (parallel bei n_workers > 1)
+    results = run_scenarios(scenario_paths, labels, args, evaluate_capacities, n_workers=args.get("n_workers", 1))
+
+    for df_H2_1, df_H2_2, df_stores_1, df_stores_2, df_charger, df_bat in results:
 
         # Szenarien-DataFrames sammeln
         h2_list_1.append(df_H2_1)
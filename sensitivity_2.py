@@ -4,7 +4,7 @@ import pandas as pd
 import numpy as np
 
 from calc_results import capacities_opt, capacities_opt_techs_global, plot_capacity_bar_multiple
-from network_visual import Etrago1
+from scenario_runner import run_scenarios
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -34,31 +34,42 @@ args = {
                       "bussize": 10,
                       "linkwidth": 5,
                       "linewidth": 3},
+    "n_workers": 1,  # Anzahl paralleler Prozesse für das Laden der Szenarien
 }
 
 
 def load_scenario_paths(folder, labels):
-    files = sorted(os.listdir(folder))
+    # nur Szenario-Ordner, keine Dateien oder versteckten Cache-Ordner (z.B. .bus_regions)
+    files = sorted(
+        f for f in os.listdir(folder)
+        if not f.startswith(".") and os.path.isdir(os.path.join(folder, f))
+    )
     if len(files) < len(labels):
         raise ValueError("Nicht genügend Dateien im Szenario-Ordner gefunden.")
     return [os.path.join(folder, f) for f in files[:len(labels)]]
 
 
+def evaluate_capacities(etrago, label):
+    """Globale und Ingolstadt-spezifische optimierte Kapazitäten eines Szenarios."""
+    cap_opt, cap_ing_opt = capacities_opt(etrago, scn=label)
+    return capacities_opt_techs_global(cap_opt), capacities_opt_techs_global(cap_ing_opt)
+
+
 def run_scenario_comparison(args):
     scenario_paths = load_scenario_paths(args["scenario_folder"], args["scenario_labels"])
+    labels = args["scenario_labels"]
 
     # Datenstrukturen für globale Technologien
     h2_list_1, h2_list_2, stores_list_1, stores_list_2, charger_list, bat_list = [], [], [], [], [], []
     # Datenstrukturen für Ingolstadt-spezifische Technologien
     ing_stores_1, ing_stores_2, ing_charger_list, ing_bat_list = [], [], [], []
 
-    for label, path in zip(args["scenario_labels"], scenario_paths):
-        logger.info(f"Lade Szenario: {label} aus {path}")
-        etrago = Etrago1(args, csv_folder=path)
-        cap_opt, cap_ing_opt = capacities_opt(etrago, scn=label)
+    # Szenarien laden und auswerten (parallel bei n_workers > 1)
+    results = run_scenarios(scenario_paths, labels, args, evaluate_capacities, n_workers=args.get("n_workers", 1))
 
+    for caps_global, caps_ing in results:
         # Globale Aufteilung
-        df_H2_1, df_H2_2, df_stores_1, df_stores_2, df_charger, df_bat = capacities_opt_techs_global(cap_opt)
+        df_H2_1, df_H2_2, df_stores_1, df_stores_2, df_charger, df_bat = caps_global
         h2_list_1.append(df_H2_1)
         h2_list_2.append(df_H2_2)
         stores_list_1.append(df_stores_1)
@@ -67,7 +78,7 @@ def run_scenario_comparison(args):
         bat_list.append(df_bat)
 
         # Ingolstadt-Aufteilung (nur wenn Einträge vorhanden)
-        df_H2_1_i, df_H2_2_i, df_stores_1_i, df_stores_2_i, df_charger_i, df_bat_i = capacities_opt_techs_global(cap_ing_opt)
+        df_H2_1_i, df_H2_2_i, df_stores_1_i, df_stores_2_i, df_charger_i, df_bat_i = caps_ing
         ing_stores_1.append(df_stores_1_i)
         ing_stores_2.append(df_stores_2_i)
         ing_charger_list.append(df_charger_i)
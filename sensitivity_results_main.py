@@ -2,7 +2,6 @@ import os
 import logging
 import pandas as pd
 import matplotlib.pyplot as plt
-from network_visual import Etrago1
 
 from calc_base_results import (
     capacities_opt_ing,
@@ -14,6 +13,7 @@ from calc_base_results import (
 from calc_results_sensitivity import (
     get_marginal_price_series
 )
+from scenario_runner import iter_scenarios, run_scenarios
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -43,12 +43,16 @@ args = {
         "linkwidth": 5,
         "linewidth": 3,
     },
+    "marginal_price_bus": "16",  # bus_id for the marginal price comparison
+    "n_workers": 1,  # number of worker processes for loading the scenarios
+    # per-scenario result cache, warm runs skip loading the networks (None disables it)
+    "result_cache_folder": "results/Sensitivity_results/Base_1_vergleich/.result_cache",
 }
 
 
-def load_etrago_objects(results_dir, labels, args):
+def scenario_folders(results_dir, labels):
     """
-    Loads all PyPSA results in the given directory and creates Etrago1 objects.
+    Returns the sorted scenario subfolders of results_dir, one per label.
 
     Parameters
     ----------
@@ -56,17 +60,15 @@ def load_etrago_objects(results_dir, labels, args):
         Path to the directory containing subfolders with PyPSA results.
     labels : list of str
         Labels to assign to each scenario.
-    args : dict
-        Arguments for Etrago1.
 
     Returns
     -------
-    list of Etrago1
+    list of str
     """
     subfolders = sorted([
         os.path.join(results_dir, d)
         for d in os.listdir(results_dir)
-        if os.path.isdir(os.path.join(results_dir, d))
+        if os.path.isdir(os.path.join(results_dir, d)) and not d.startswith(".")
     ])
 
     if len(subfolders) != len(labels):
@@ -74,74 +76,81 @@ def load_etrago_objects(results_dir, labels, args):
             f"Number of subfolders ({len(subfolders)}) does not match number of labels ({len(labels)})."
         )
 
-    etrago_list = []
-    for folder, label in zip(subfolders, labels):
-        logger.info(f"Loading scenario: {label} from {folder}")
-        etrago = Etrago1(args, csv_folder=folder)
-        etrago_list.append(etrago)
+    return subfolders
 
-    return etrago_list
 
-
-def collect_all_data(etrago_list):
+def evaluate_scenario(etrago, label):
     """
-    Collects all relevant DataFrames for each scenario.
+    Extracts the per-scenario results used for the comparison plots.
 
     Returns
     -------
-    dict of DataFrames
+    dict
         Keys: 'capacities', 'electricity', 'central_heat', 'decentral_heat'
+        and 'marginal_price' (series of args["marginal_price_bus"]).
     """
-    capacities = []
-    electricity = []
-    central_heat = []
-    decentral_heat = []
-
-    for etrago in etrago_list:
-        df_cap = capacities_opt_ing(etrago)
-        df_el = df_electricity_generation(etrago)
-        df_ch = df_central_heat_generation(etrago)
-        df_dh = df_decentral_heat_generation(etrago)
-
-        capacities.append(df_cap)
-        electricity.append(df_el)
-        central_heat.append(df_ch)
-        decentral_heat.append(df_dh)
-
     return {
-        "capacities": capacities,
-        "electricity": electricity,
-        "central_heat": central_heat,
-        "decentral_heat": decentral_heat
+        "capacities": capacities_opt_ing(etrago),
+        "electricity": df_electricity_generation(etrago),
+        "central_heat": df_central_heat_generation(etrago),
+        "decentral_heat": df_decentral_heat_generation(etrago),
+        "marginal_price": get_marginal_price_series(etrago, etrago.args["marginal_price_bus"]),
     }
 
 
-def merge_scenario_data(dataframes, value_column):
-    """
-    Merges a list of scenario DataFrames into a single DataFrame for plotting.
+# value column of each per-scenario result frame
+VALUE_COLUMNS = {
+    "capacities": "Capacity",
+    "electricity": "generation",
+    "central_heat": "generation_cH",
+    "decentral_heat": "generation_dH",
+}
 
-    Parameters
-    ----------
-    dataframes : list of pd.DataFrame
-        One per scenario.
-    value_column : str
-        Column to merge (e.g., 'generation', 'Capacity').
+
+def stream_scenario_data(results_dir, labels, args):
+    """
+    Loads and evaluates the scenarios one at a time and merges their results
+    directly into the comparison DataFrames. Each network is released before
+    the next one is loaded, so peak memory is bounded by one scenario
+    (or by args["n_workers"] scenarios in parallel mode).
 
     Returns
     -------
-    pd.DataFrame
-        Index: carrier, Columns: scenarios.
+    dict
+        Keys of VALUE_COLUMNS with merged DataFrames (index: carrier,
+        columns: scenarios) and 'marginal_price' with one series per scenario.
     """
-    merged = None
-    for idx, df in enumerate(dataframes):
-        df_pivot = df.set_index("carrier")[[value_column]]
-        df_pivot.columns = [f"scenario_{idx+1}"]
-        if merged is None:
-            merged = df_pivot
-        else:
-            merged = merged.join(df_pivot, how="outer")
-    merged = merged.fillna(0)
-    return merged
+    folders = scenario_folders(results_dir, labels)
+    n_workers = args.get("n_workers", 1)
+
+    if n_workers > 1:
+        results = run_scenarios(folders, labels, args, evaluate_scenario, n_workers=n_workers)
+    else:
+        results = (result for _, result in iter_scenarios(folders, labels, args, evaluate_scenario))
+
+    merged = dict.fromkeys(VALUE_COLUMNS)
+    price_series_list = []
+    for idx, result in enumerate(results):
+        for key, value_column in VALUE_COLUMNS.items():
+            merged[key] = join_scenario_data(merged[key], result[key], value_column, idx)
+        price_series_list.append(result["marginal_price"])
+
+    data = {key: df.fillna(0) for key, df in merged.items()}
+    data["marginal_price"] = price_series_list
+    return data
+
+
+def join_scenario_data(merged, df, value_column, idx):
+    """
+    Joins the result of scenario ``idx`` as column 'scenario_{idx+1}' to ``merged``.
+    """
+    df_pivot = df.set_index("carrier")[[value_column]]
+    # categorical carriers (compact mode) are joined as plain labels
+    df_pivot.index = df_pivot.index.astype(object)
+    df_pivot.columns = [f"scenario_{idx+1}"]
+    if merged is None:
+        return df_pivot
+    return merged.join(df_pivot, how="outer")
 
 
 def plot_multibar(
@@ -238,13 +247,13 @@ if __name__ == "__main__":
     results_dir = args["pypsa_networks"]
     labels = args["labels"]
 
-    etrago_list = load_etrago_objects(results_dir, labels, args)
-    data = collect_all_data(etrago_list)
+    # one scenario at a time: load, extract results, release network
+    data = stream_scenario_data(results_dir, labels, args)
 
     output_folder = args["results_folder"]
 
     # Capacities
-    df_caps = merge_scenario_data(data["capacities"], "Capacity")
+    df_caps = data["capacities"]
     plot_multibar(
         df_caps,
         labels,
@@ -255,7 +264,7 @@ if __name__ == "__main__":
     )
 
     # Electricity generation
-    df_elec = merge_scenario_data(data["electricity"], "generation")
+    df_elec = data["electricity"]
     plot_multibar(
         df_elec,
         labels,
@@ -266,7 +275,7 @@ if __name__ == "__main__":
     )
 
     # Central heat
-    df_ch = merge_scenario_data(data["central_heat"], "generation_cH")
+    df_ch = data["central_heat"]
     plot_multibar(
         df_ch,
         labels,
@@ -277,7 +286,7 @@ if __name__ == "__main__":
     )
 
     # Decentral heat
-    df_dh = merge_scenario_data(data["decentral_heat"], "generation_dH")
+    df_dh = data["decentral_heat"]
     plot_multibar(
         df_dh,
         labels,
@@ -287,15 +296,9 @@ if __name__ == "__main__":
         output_folder=output_folder
     )
 
-    # Example bus_id
-    bus_id = "16"
-
-    # Get time series for all scenarios
-    price_series_list = [get_marginal_price_series(e, bus_id) for e in etrago_list]
-
     # marginal_prices
     plot_marginal_price_comparison(
-        price_series_list,
+        data["marginal_price"],
         labels,
         title="Strompreis Zeitreihen",
         ylabel="Strompreis [€/MWh]",
@@ -0,0 +1,223 @@
+"""
+Memory-mapped store for the large dispatch time series of a result folder.
+
+Each stored series (e.g. links_t.p0) is written once as a dense float array
+(snapshots x components) in Fortran order to a ``.npy`` file, together with
+a JSON file holding the snapshot and component index. Reading opens the
+arrays with ``np.load(mmap_mode="r")``: only the columns an aggregation
+touches are paged in, and all processes that open the same store share one
+physical copy through the OS page cache.
+
+The store lives in ``<csv_folder>/.timeseries_store`` and is rebuilt when the
+CSV files of the folder change (see network_loader.folder_fingerprint). It is
+built in a temporary folder and moved into place when complete, so parallel
+workers and interrupted builds never see a partly written store.
+"""
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from network_loader import folder_fingerprint, read_csv_table, table_names
+
+logger = logging.getLogger(__name__)
+
+STORE_FOLDER = ".timeseries_store"
+METADATA_FILE = "metadata.json"
+
+# bump when the layout of the store changes
+STORE_VERSION = 2
+
+# the dominant memory consumers of eTraGo results
+DEFAULT_SERIES = [
+    ("links", "p0"),
+    ("links", "p1"),
+    ("lines", "p0"),
+    ("generators", "p"),
+    ("storage_units", "p"),
+]
+
+
+def store_folder(csv_folder):
+    return os.path.join(csv_folder, STORE_FOLDER)
+
+
+def build_store(csv_folder, snapshots, series=DEFAULT_SERIES, read_table=None):
+    """
+    Writes the given time series of a result folder to a memory-mapped store.
+
+    Parameters
+    ----------
+    csv_folder : str
+        PyPSA csv folder.
+    snapshots : pd.Index
+        Snapshots of the loaded network; PyPSA writes the time series with a
+        positional index, so the rows are assigned to the snapshots by position.
+    series : list of tuple
+        (component list name, attribute) pairs, e.g. ("links", "p0").
+    read_table : callable, optional
+        read_table(name) -> pd.DataFrame, default: read the CSV file
+        (e.g. network_loader.read_cached_table for the Parquet cache).
+    """
+    read_table = read_table or (lambda name: read_csv_table(csv_folder, name))
+    folder = store_folder(csv_folder)
+    tmp_folder = f"{folder}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    os.makedirs(tmp_folder)
+    try:
+        _write_store(tmp_folder, csv_folder, snapshots, series, read_table)
+    except BaseException:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        raise
+
+    # a folder cannot replace an existing one in a single step:
+    # move the old store aside, then move the new one into place
+    old_folder = f"{folder}.{os.getpid()}.old"
+    try:
+        os.replace(folder, old_folder)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(tmp_folder, folder)
+    except OSError:
+        # a parallel build has moved its (identical) store into place first
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+    shutil.rmtree(old_folder, ignore_errors=True)
+
+    logger.info(f"Zeitreihen-Store erstellt unter: {folder}")
+
+
+def _write_store(folder, csv_folder, snapshots, series, read_table):
+    available = set(table_names(csv_folder))
+    metadata = {"version": STORE_VERSION, "fingerprint": folder_fingerprint(csv_folder), "series": {}}
+
+    for list_name, attr in series:
+        name = f"{list_name}-{attr}"
+        if name not in available:
+            continue
+        # one frame at a time, so that building needs memory for one series only
+        df = read_table(name)
+        if len(df) != len(snapshots):
+            raise ValueError(f"Zeitreihe {name} hat {len(df)} Zeilen, das Netzwerk {len(snapshots)} Snapshots.")
+        array = np.lib.format.open_memmap(
+            os.path.join(folder, f"{name}.npy"), mode="w+",
+            dtype=np.float64, shape=df.shape, fortran_order=True
+        )
+        array[:] = df.to_numpy(dtype=np.float64)
+        array.flush()
+        del array
+
+        metadata["series"][name] = {
+            "columns": df.columns.astype(str).tolist(),
+            "snapshots": [str(s) for s in snapshots],
+            "datetime": isinstance(snapshots, pd.DatetimeIndex),
+        }
+
+    # metadata last: it marks the store as complete
+    with open(os.path.join(folder, METADATA_FILE), "w") as f:
+        json.dump(metadata, f)
+
+
+def open_store(csv_folder, snapshots, series=DEFAULT_SERIES, read_table=None):
+    """
+    Opens the store of a result folder, building it first if it is missing or outdated.
+
+    Parameters
+    ----------
+    csv_folder, snapshots, series, read_table
+        See build_store.
+
+    Returns
+    -------
+    TimeSeriesStore
+    """
+    path = os.path.join(store_folder(csv_folder), METADATA_FILE)
+    try:
+        with open(path) as f:
+            metadata = json.load(f)
+        valid = (metadata.get("version") == STORE_VERSION
+                 and metadata.get("fingerprint") == folder_fingerprint(csv_folder))
+    except (OSError, ValueError):
+        # missing, or just being replaced by a parallel build
+        valid = False
+    if not valid:
+        build_store(csv_folder, snapshots, series, read_table)
+
+    return TimeSeriesStore(store_folder(csv_folder))
+
+
+class TimeSeriesStore:
+    """
+    Read-only access to the memory-mapped time series of one result folder.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        with open(os.path.join(folder, METADATA_FILE)) as f:
+            self.metadata = json.load(f)["series"]
+        self._indexes = {}
+
+        # open all arrays now: the memory maps stay valid even if a parallel
+        # build replaces the folder later
+        self._arrays = {}
+        for name, meta in self.metadata.items():
+            array = np.load(os.path.join(folder, f"{name}.npy"), mmap_mode="r")
+            if array.shape != (len(meta["snapshots"]), len(meta["columns"])):
+                raise ValueError(f"Zeitreihen-Store {folder}: {name} passt nicht zu den Metadaten.")
+            self._arrays[name] = array
+
+    def __contains__(self, key):
+        list_name, attr = key
+        return f"{list_name}-{attr}" in self.metadata
+
+    def _index(self, name):
+        if name not in self._indexes:
+            meta = self.metadata[name]
+            snapshots = pd.Index(meta["snapshots"], name="snapshot")
+            if meta["datetime"]:
+                snapshots = pd.DatetimeIndex(pd.to_datetime(snapshots), name="snapshot")
+            self._indexes[name] = (snapshots, pd.Index(meta["columns"]))
+        return self._indexes[name]
+
+    def array(self, list_name, attr):
+        """
+        Returns the memory-mapped array (snapshots x components) of a series.
+        """
+        return self._arrays[f"{list_name}-{attr}"]
+
+    def frame(self, list_name, attr, columns=None):
+        """
+        Returns a series as DataFrame.
+
+        Without ``columns`` the DataFrame wraps the memory map without copying;
+        with ``columns`` only these components are read.
+
+        Parameters
+        ----------
+        list_name : str
+            Component list name, e.g. 'links'.
+        attr : str
+            Time-series attribute, e.g. 'p0'.
+        columns : list-like, optional
+            Component names.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        name = f"{list_name}-{attr}"
+        snapshots, all_columns = self._index(name)
+        array = self.array(list_name, attr)
+
+        if columns is None:
+            return pd.DataFrame(array, index=snapshots, columns=all_columns, copy=False)
+
+        columns = pd.Index(columns)
+        positions = all_columns.get_indexer(columns)
+        if (positions < 0).any():
+            raise KeyError(f"{list(columns[positions < 0])} not in {name}")
+        # Fortran order: every component is one contiguous block on disk
+        return pd.DataFrame(array[:, positions], index=snapshots, columns=columns)